@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Iterator, Sequence
+from typing import NamedTuple
+
+from aoclib.int_range import IntRange
+
+
+class Box(NamedTuple):
+    """
+    An N-dimensional box of ints: ``lo[i] <= p[i] <= hi[i]`` on every axis.
+
+    Boxes are immutable; every operation returns new boxes, and ``None`` stands
+    for an empty result, like `IntRange.join`.
+    """
+
+    lo: tuple[int, ...]
+    hi: tuple[int, ...]
+
+    @classmethod
+    def from_ranges(cls, ranges: Iterable[IntRange]) -> Box:
+        ranges = list(ranges)
+        return cls(tuple(r.low for r in ranges), tuple(r.high for r in ranges))
+
+    @property
+    def dim(self) -> int:
+        return len(self.lo)
+
+    def range(self, axis: int) -> IntRange:
+        return IntRange(self.lo[axis], self.hi[axis])
+
+    @property
+    def empty(self) -> bool:
+        return any(lo > hi for lo, hi in zip(self.lo, self.hi))
+
+    @property
+    def volume(self) -> int:
+        return math.prod(max(hi - lo + 1, 0) for lo, hi in zip(self.lo, self.hi))
+
+    def contains(self, p: Sequence[int]) -> bool:
+        return all(lo <= x <= hi for lo, x, hi in zip(self.lo, p, self.hi))
+
+    def split(self, axis: int, threshold: int) -> tuple[Box | None, Box | None]:
+        """Splits into the parts with ``p[axis] < threshold`` and the rest."""
+        lo = self.lo[axis]
+        hi = self.hi[axis]
+        if threshold <= lo:
+            return None, self
+        if threshold > hi:
+            return self, None
+        below = Box(self.lo, self.hi[:axis] + (threshold - 1,) + self.hi[axis + 1 :])
+        above = Box(self.lo[:axis] + (threshold,) + self.lo[axis + 1 :], self.hi)
+        return below, above
+
+    def intersect(self, other: Box) -> Box | None:
+        lo = tuple(map(max, self.lo, other.lo))
+        hi = tuple(map(min, self.hi, other.hi))
+        if any(a > b for a, b in zip(lo, hi)):
+            return None
+        return Box(lo, hi)
+
+    def difference(self, other: Box) -> list[Box]:
+        """``self`` minus ``other``, as at most ``2 * dim`` disjoint boxes."""
+        if self.intersect(other) is None:
+            return [self]
+        res = []
+        rest: Box | None = self
+        for axis in range(self.dim):
+            assert rest is not None
+            below, rest = rest.split(axis, other.lo[axis])
+            if below is not None:
+                res.append(below)
+            assert rest is not None
+            rest, above = rest.split(axis, other.hi[axis] + 1)
+            if above is not None:
+                res.append(above)
+        return res
+
+
+class Region:
+    """A union of boxes, kept as disjoint boxes so its volume is exact."""
+
+    def __init__(self, boxes: Iterable[Box] = ()) -> None:
+        self.boxes: list[Box] = []
+        for box in boxes:
+            self.add(box)
+
+    def __iter__(self) -> Iterator[Box]:
+        return iter(self.boxes)
+
+    def add(self, box: Box) -> None:
+        pieces = [] if box.empty else [box]
+        for other in self.boxes:
+            pieces = [q for p in pieces for q in p.difference(other)]
+            if not pieces:
+                return
+        self.boxes.extend(pieces)
+
+    def contains(self, p: Sequence[int]) -> bool:
+        return any(box.contains(p) for box in self.boxes)
+
+    @property
+    def volume(self) -> int:
+        return sum(box.volume for box in self.boxes)
+
+
+class BoxIndex:
+    """
+    A k-d tree over disjoint boxes for point location.
+
+    Every inner node cuts space at ``p[axis] < threshold``; boxes crossing a
+    cut are split into both children, so every leaf holds at most
+    ``leaf_size`` disjoint boxes (unless the cuts run out) and a query walks
+    one root-to-leaf path and scans one leaf.
+    """
+
+    def __init__(self, boxes: Iterable[Box], leaf_size: int = 4) -> None:
+        # Node arrays; axis -1 marks a leaf whose boxes are in leaf_boxes
+        self.axis: list[int] = []
+        self.threshold: list[int] = []
+        self.children: list[int] = []  # left child; the right one follows it
+        self.leaf_boxes: list[list[Box]] = []
+        self.num_boxes = 0
+
+        stack = [(self._new_node(), [box for box in boxes if not box.empty])]
+        while stack:
+            node, bs = stack.pop()
+            cut = self._choose_cut(bs) if len(bs) > leaf_size else None
+            if cut is None:
+                self.leaf_boxes[node] = bs
+                self.num_boxes += len(bs)
+                continue
+            axis, threshold = cut
+            below: list[Box] = []
+            above: list[Box] = []
+            for box in bs:
+                lo, hi = box.split(axis, threshold)
+                if lo is not None:
+                    below.append(lo)
+                if hi is not None:
+                    above.append(hi)
+            left = self._new_node()
+            self._new_node()
+            self.axis[node] = axis
+            self.threshold[node] = threshold
+            self.children[node] = left
+            stack.append((left, below))
+            stack.append((left + 1, above))
+
+    def _new_node(self) -> int:
+        self.axis.append(-1)
+        self.threshold.append(0)
+        self.children.append(-1)
+        self.leaf_boxes.append([])
+        return len(self.axis) - 1
+
+    @staticmethod
+    def _choose_cut(boxes: list[Box]) -> tuple[int, int] | None:
+        # Cut at the median lower corner on the axis where they vary the most.
+        # It lies above the smallest one, so the left child loses every box
+        # starting at or above it; the right child loses every box ending
+        # below it or its distinct corners on that axis shrink.
+        best: tuple[int, int] | None = None
+        best_count = 1
+        for axis in range(boxes[0].dim):
+            lows = sorted({box.lo[axis] for box in boxes})
+            if len(lows) > best_count:
+                best_count = len(lows)
+                best = (axis, lows[len(lows) // 2])
+        return best
+
+    def find(self, p: Sequence[int]) -> Box | None:
+        """The box containing ``p``, if any."""
+        axis = self.axis
+        threshold = self.threshold
+        children = self.children
+        node = 0
+        while axis[node] >= 0:
+            a = axis[node]
+            node = children[node] + (p[a] >= threshold[node])
+        for box in self.leaf_boxes[node]:
+            if box.contains(p):
+                return box
+        return None
+
+    def contains(self, p: Sequence[int]) -> bool:
+        return self.find(p) is not None
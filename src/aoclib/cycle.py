@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from hashlib import blake2b
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def digest64(data: bytes) -> int:
+    """A 64-bit fingerprint of ``data``, cheap to keep one per iteration."""
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "little")
+
+
+def brent(
+    x0: T,
+    step: Callable[[T], T],
+    key: Callable[[T], Hashable] = lambda x: x,
+) -> tuple[int, int]:
+    """
+    Brent's cycle detection on the sequence ``x0, step(x0), ...``.
+
+    Returns ``(mu, lam)``: the sequence is periodic with period ``lam`` from
+    index ``mu`` on. Uses O(1) memory, but ``step`` must return a new state
+    rather than mutate its argument, since states are kept and replayed.
+    """
+    power = lam = 1
+    tortoise = x0
+    hare = step(x0)
+    while key(tortoise) != key(hare):
+        if power == lam:
+            tortoise = hare
+            power *= 2
+            lam = 0
+        hare = step(hare)
+        lam += 1
+
+    tortoise = hare = x0
+    for _ in range(lam):
+        hare = step(hare)
+    mu = 0
+    while key(tortoise) != key(hare):
+        tortoise = step(tortoise)
+        hare = step(hare)
+        mu += 1
+
+    return mu, lam
+
+
+def fast_forward(
+    x0: T,
+    step: Callable[[T], T],
+    n: int,
+    key: Callable[[T], Hashable] = lambda x: x,
+    use_brent: bool = False,
+) -> T:
+    """
+    The state after ``n`` steps of a deterministic simulation, skipping whole
+    periods once the states start repeating.
+
+    By default each state's ``key`` is recorded with its index until one
+    repeats, which costs O(mu + lam) keys; make them compact (an int digest or
+    a small tuple) rather than the state itself. ``step`` may then mutate and
+    return its argument. With ``use_brent``, see `brent`.
+    """
+    if use_brent:
+        mu, lam = brent(x0, step, key)
+        if n > mu:
+            n = mu + (n - mu) % lam
+        x = x0
+        for _ in range(n):
+            x = step(x)
+        return x
+
+    seen: dict[Hashable, int] = {}
+    x = x0
+    for i in range(n):
+        k = key(x)
+        if k in seen:
+            for _ in range((n - i) % (i - seen[k])):
+                x = step(x)
+            return x
+        seen[k] = i
+        x = step(x)
+    return x
@@ -1,5 +1,11 @@
+from __future__ import annotations
+
+from array import array
 from collections import deque
 from dataclasses import dataclass
+from typing import Any
+
+from aoclib.graph.graph import Graph
 
 
 @dataclass
@@ -11,6 +17,18 @@ class FlowEdge:
 
 
 class Dinic:
+    """
+    Dinic's max flow.
+
+    Edges live in parallel arrays indexed by edge id: ``to[eid]``, ``cap[eid]``
+    and ``flow[eid]``. Every edge is stored next to its reverse, so the reverse
+    of ``eid`` is ``eid ^ 1`` and the tail of ``eid`` is ``to[eid ^ 1]``.
+
+    With ``integral=True`` capacities must be ints; they are stored as 64-bit
+    integers and residual capacities are compared exactly instead of against
+    ``eps``.
+    """
+
     def __init__(
         self,
         n: int,
@@ -18,73 +36,166 @@ class Dinic:
         t: int,
         inf: float = 1e9,
         eps: float = 1e-9,
+        integral: bool = False,
     ) -> None:
         self.n = n
         self.s = s
         self.t = t
-        self.inf = inf
-        self.eps = eps
+        self.integral = integral
+        self.inf = int(inf) if integral else inf
+        self.eps = 0 if integral else eps
         self.adj: list[list[int]] = [[] for _ in range(n)]  # stores indices of edges
         self.level = [0 for _ in range(n)]  # shortest distance from source
         self.ptr = [0 for _ in range(n)]  # the next edge that can be used
-        self.edges: list[FlowEdge] = []
+        typecode = "q" if integral else "d"
+        self.to: array[int] = array("i")
+        self.cap: array[Any] = array(typecode)
+        self.flow: array[Any] = array(typecode)
+
+    @classmethod
+    def from_graph(cls, g: Graph, s: int, t: int, c: float = 1, **kwargs) -> Dinic:
+        # Every arc u -> v of g gets capacity c, so an UndiGraph (or its frozen
+        # CSRGraph) yields capacity c in both directions.
+        dinic = cls(g.n, s, t, **kwargs)
+        for u in range(g.n):
+            for v in g.adj[u]:
+                dinic.add_edge(u, v, c)
+        return dinic
+
+    @property
+    def m(self) -> int:
+        return len(self.to)
 
     def add_edge(self, u: int, v: int, c: float, rc: float = 0) -> None:
-        eid = len(self.edges)
+        eid = len(self.to)
         self.adj[u].append(eid)
         self.adj[v].append(eid + 1)
-        self.edges.append(FlowEdge(u, v, c, 0))
-        self.edges.append(FlowEdge(v, u, rc, 0))
+        self.to.append(v)
+        self.to.append(u)
+        self.cap.append(c)
+        self.cap.append(rc)
+        self.flow.append(0)
+        self.flow.append(0)
+
+    def get_edge(self, eid: int) -> FlowEdge:
+        return FlowEdge(self.to[eid ^ 1], self.to[eid], self.cap[eid], self.flow[eid])
 
     def bfs(self) -> bool:
-        self.level = [-1 for _ in range(self.n)]
-        self.level[self.s] = 0
+        to = self.to
+        cap = self.cap
+        flow = self.flow
+        eps = self.eps
+        level = [-1 for _ in range(self.n)]
+        level[self.s] = 0
         q: deque[int] = deque([self.s])
 
         while len(q) > 0:
             u = q.popleft()
+            next_level = level[u] + 1
             for eid in self.adj[u]:
-                e = self.edges[eid]
-                if e.c - e.f <= self.eps or self.level[e.v] != -1:
+                v = to[eid]
+                if cap[eid] - flow[eid] <= eps or level[v] != -1:
                     continue
-                self.level[e.v] = self.level[u] + 1
-                q.append(e.v)
-
-        return self.level[self.t] != -1
-
-    def dfs(self, u: int, flow: float) -> float:
-        if u == self.t:
-            return flow
-
-        for j in range(self.ptr[u], len(self.adj[u])):
-            eid = self.adj[u][j]
-            e = self.edges[eid]
-            if e.c - e.f > 0 and self.level[e.v] == self.level[u] + 1:
-                df = self.dfs(e.v, min(e.c - e.f, flow))
-                if df > 0:
-                    self.edges[eid].f += df
-                    self.edges[eid ^ 1].f -= df
-                    return df
-
-        return 0
+                level[v] = next_level
+                q.append(v)
+
+        self.level = level
+        return level[self.t] != -1
+
+    def blocking_flow(self, limit: float | None = None) -> float:
+        """
+        Saturates the level graph left by `bfs` with an explicit path stack:
+        advance along admissible edges, augment on reaching t and retreat to
+        the first saturated edge, or drop a dead end and try its next edge.
+        Stops early once ``limit`` units have been pushed.
+        """
+        adj = self.adj
+        to = self.to
+        cap = self.cap
+        flow = self.flow
+        level = self.level
+        ptr = self.ptr
+        eps = self.eps
+        s = self.s
+        t = self.t
+
+        total: float = 0
+        remaining = self.inf if limit is None else limit
+        path: list[int] = []  # edge ids from s to u
+        u = s
+
+        while True:
+            if u == t:
+                df = remaining
+                for eid in path:
+                    if cap[eid] - flow[eid] < df:
+                        df = cap[eid] - flow[eid]
+                for eid in path:
+                    flow[eid] += df
+                    flow[eid ^ 1] -= df
+                total += df
+                remaining -= df
+                if remaining <= eps:
+                    break
+                for k, eid in enumerate(path):
+                    if cap[eid] - flow[eid] <= eps:
+                        del path[k:]
+                        break
+                u = to[path[-1]] if path else s
+                continue
+
+            eids = adj[u]
+            j = ptr[u]
+            next_level = level[u] + 1
+            while j < len(eids):
+                eid = eids[j]
+                if cap[eid] - flow[eid] > eps and level[to[eid]] == next_level:
+                    break
+                j += 1
+            ptr[u] = j
 
-    def max_flow(self) -> float:
+            if j < len(eids):
+                path.append(eids[j])
+                u = to[eids[j]]
+            elif u == s:
+                break
+            else:  # dead end: retreat and skip the edge that led here
+                eid = path.pop()
+                u = to[eid ^ 1]
+                ptr[u] += 1
+
+        return total
+
+    def max_flow(self, limit: float | None = None) -> float:
+        """
+        Augments the current flow to a maximum one and returns the value added.
+        With ``limit``, stops as soon as that much has been added, so the result
+        is ``min(max flow, limit)``: enough to tell whether a cut is below it.
+        """
+        assert self.s != self.t
         f: float = 0
 
         while self.bfs():
             self.ptr = [0 for _ in range(self.n)]
-            total_df: float = 0
-            while True:
-                df = self.dfs(self.s, self.inf)
-                if df <= self.eps:
-                    break
-                total_df += df
+            total_df = self.blocking_flow(None if limit is None else limit - f)
             if total_df <= self.eps:
                 break
             f += total_df
+            if limit is not None and f >= limit - self.eps:
+                break
 
         return f
 
+    def reset_flow(self) -> None:
+        """Zeroes every edge flow, keeping the network and its capacities."""
+        self.flow = array(self.flow.typecode, [0]) * len(self.flow)
+
+    def set_terminals(self, s: int, t: int) -> None:
+        """Moves the source and sink, resetting the flow that is no longer valid."""
+        self.s = s
+        self.t = t
+        self.reset_flow()
+
     def get_min_cut(self) -> list[int]:
         self.bfs()
         return [u for u in range(self.n) if self.level[u] != -1]
@@ -94,7 +205,6 @@ class Dinic:
         min_cut_cap: float = 0
         for u in cut:
             for eid in self.adj[u]:
-                e = self.edges[eid]
-                if self.level[e.v] == -1:
-                    min_cut_cap += e.c
+                if self.level[self.to[eid]] == -1:
+                    min_cut_cap += self.cap[eid]
         return min_cut_cap
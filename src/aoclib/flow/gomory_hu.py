@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from aoclib.flow.dinic import Dinic
+
+
+class GomoryHu:
+    """
+    Gomory–Hu tree of an undirected weighted graph, built with Gusfield's
+    algorithm: n - 1 max flow calls on one reusable `Dinic` network.
+
+    The minimum cut between any two nodes is the lightest edge on their tree
+    path, so every all-pairs min cut question is answered from the tree.
+
+    Attributes
+    ----------
+    parent : list[int]
+        Tree parent of every node; node 0 is the root, with parent -1.
+    weight : list[float]
+        Weight of the tree edge (u, parent[u]), which is also the min cut value
+        between u and parent[u] in the graph.
+    side : list[list[int]]
+        For u > 0, the side containing u of a min cut between u and parent[u].
+    """
+
+    def __init__(
+        self,
+        n: int,
+        edges: Iterable[tuple[int, int, float]],
+        integral: bool = False,
+    ) -> None:
+        self.n = n
+        dinic = Dinic(n, 0, 0, integral=integral)
+        for u, v, w in edges:
+            dinic.add_edge(u, v, w, w)
+
+        self.parent = [-1 if u == 0 else 0 for u in range(n)]
+        self.weight: list[float] = [0 for _ in range(n)]
+        self.side: list[list[int]] = [[] for _ in range(n)]
+
+        for s in range(1, n):
+            t = self.parent[s]
+            dinic.set_terminals(s, t)
+            self.weight[s] = dinic.max_flow()
+            self.side[s] = dinic.get_min_cut()
+            for v in self.side[s]:
+                if v > s and self.parent[v] == t:
+                    self.parent[v] = s
+
+        self.depth = [0 for _ in range(n)]
+        for u in range(1, n):
+            # Gusfield only ever attaches a node to a smaller one
+            self.depth[u] = self.depth[self.parent[u]] + 1
+
+    def tree(self) -> list[tuple[int, int, float]]:
+        return [(u, self.parent[u], self.weight[u]) for u in range(1, self.n)]
+
+    def min_cut(self, u: int, v: int) -> float:
+        assert u != v
+        parent = self.parent
+        depth = self.depth
+        ans: float | None = None
+        while u != v:
+            if depth[u] < depth[v]:
+                u, v = v, u
+            if ans is None or self.weight[u] < ans:
+                ans = self.weight[u]
+            u = parent[u]
+        assert ans is not None
+        return ans
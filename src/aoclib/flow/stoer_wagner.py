@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import heapq
+from collections.abc import Iterable
+
+
+def stoer_wagner(
+    n: int, edges: Iterable[tuple[int, int, float]]
+) -> tuple[float, list[int]]:
+    """
+    Global minimum cut of an undirected weighted graph on nodes ``0..n-1``.
+
+    Returns the cut weight and the nodes on one side of it. Parallel edges add
+    up and self loops are ignored. Each of the n - 1 phases grows a maximum
+    adjacency order with a lazy heap, then merges its last two nodes.
+    """
+    assert n >= 2
+    adj: list[dict[int, float]] = [{} for _ in range(n)]
+    for u, v, w in edges:
+        if u == v:
+            continue
+        adj[u][v] = adj[u].get(v, 0) + w
+        adj[v][u] = adj[v].get(u, 0) + w
+
+    members = [[u] for u in range(n)]
+    alive = list(range(n))
+    best: float | None = None
+    best_side: list[int] = []
+
+    for _ in range(n - 1):
+        # Every alive node starts at weight 0, so disconnected graphs work too.
+        weight: dict[int, float] = {u: 0 for u in alive}
+        heap: list[tuple[float, int]] = [(0, u) for u in alive]
+        added: set[int] = set()
+        prev = last = -1
+        cut_of_phase: float = 0
+
+        while len(added) < len(alive):
+            neg_w, u = heapq.heappop(heap)
+            if u in added or -neg_w != weight[u]:
+                continue
+            added.add(u)
+            prev, last = last, u
+            cut_of_phase = -neg_w
+            for v, w in adj[u].items():
+                if v not in added:
+                    weight[v] += w
+                    heapq.heappush(heap, (-weight[v], v))
+
+        if best is None or cut_of_phase < best:
+            best = cut_of_phase
+            best_side = list(members[last])
+
+        # Merge last into prev
+        members[prev].extend(members[last])
+        members[last] = []
+        for v, w in adj[last].items():
+            del adj[v][last]
+            if v != prev:
+                adj[prev][v] = adj[prev].get(v, 0) + w
+                adj[v][prev] = adj[v].get(prev, 0) + w
+        adj[last] = {}
+        alive.remove(last)
+
+    assert best is not None
+    return best, best_side
@@ -5,8 +5,9 @@ from fractions import Fraction
 from typing import Generic, TypeVar
 
 from aoclib.geometry.point import Point
+from aoclib.geometry.rational import Rational
 
-T = TypeVar("T", int, float, Fraction)
+T = TypeVar("T", int, float, Fraction, Rational)
 
 
 @dataclass
@@ -6,7 +6,7 @@ from typing import Generic, TypeVar
 
 from aoclib.geometry.rational import Rational
 
-T = TypeVar("T", int, float, Fraction)
+T = TypeVar("T", int, float, Fraction, Rational)
 
 
 @dataclass
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Point3:
+    x: int
+    y: int
+    z: int
+
+    def __add__(self, other: Point3) -> Point3:
+        return Point3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other: Point3) -> Point3:
+        return Point3(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __neg__(self) -> Point3:
+        return Point3(-self.x, -self.y, -self.z)
+
+    def __mul__(self, k: int) -> Point3:
+        return Point3(self.x * k, self.y * k, self.z * k)
+
+    def dot(self, other: Point3) -> int:
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def cross(self, other: Point3) -> Point3:
+        return Point3(
+            self.y * other.z - self.z * other.y,
+            self.z * other.x - self.x * other.z,
+            self.x * other.y - self.y * other.x,
+        )
+
+
+# Points and displacement vectors share one type, like the 2D Point
+Vec3 = Point3
+
+
+class PointArray:
+    """
+    Int 3D points stored as parallel ``array('q')`` columns ``xs``, ``ys`` and
+    ``zs``, without an object per point.
+
+    Batch operations return new columns; like the storage, their results must
+    fit in 64 bits, otherwise the array raises OverflowError.
+    """
+
+    def __init__(
+        self,
+        xs: Iterable[int] = (),
+        ys: Iterable[int] = (),
+        zs: Iterable[int] = (),
+    ) -> None:
+        self.xs = array("q", xs)
+        self.ys = array("q", ys)
+        self.zs = array("q", zs)
+        assert len(self.xs) == len(self.ys) == len(self.zs)
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point3]) -> PointArray:
+        pa = cls()
+        for p in points:
+            pa.append(p)
+        return pa
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, i: int) -> Point3:
+        return Point3(self.xs[i], self.ys[i], self.zs[i])
+
+    def __iter__(self) -> Iterator[Point3]:
+        return map(Point3, self.xs, self.ys, self.zs)
+
+    def append(self, p: Point3) -> None:
+        self.xs.append(p.x)
+        self.ys.append(p.y)
+        self.zs.append(p.z)
+
+    def translate(self, d: Vec3) -> PointArray:
+        """Every point moved by ``d``."""
+        dx, dy, dz = d.x, d.y, d.z
+        return PointArray(
+            (x + dx for x in self.xs),
+            (y + dy for y in self.ys),
+            (z + dz for z in self.zs),
+        )
+
+    def dot(self, other: PointArray | Vec3) -> array[int]:
+        """Dot products with the matching points of ``other``, or with one vector."""
+        if isinstance(other, Point3):
+            vx, vy, vz = other.x, other.y, other.z
+            return array(
+                "q",
+                (
+                    x * vx + y * vy + z * vz
+                    for x, y, z in zip(self.xs, self.ys, self.zs)
+                ),
+            )
+        assert len(other) == len(self)
+        return array(
+            "q",
+            map(
+                lambda x, y, z, ox, oy, oz: x * ox + y * oy + z * oz,
+                self.xs,
+                self.ys,
+                self.zs,
+                other.xs,
+                other.ys,
+                other.zs,
+            ),
+        )
+
+    def cross(self, other: PointArray) -> PointArray:
+        """Cross products with the matching points of ``other``."""
+        assert len(other) == len(self)
+        xs, ys, zs = self.xs, self.ys, self.zs
+        oxs, oys, ozs = other.xs, other.ys, other.zs
+        return PointArray(
+            map(lambda y, z, oy, oz: y * oz - z * oy, ys, zs, oys, ozs),
+            map(lambda x, z, ox, oz: z * ox - x * oz, xs, zs, oxs, ozs),
+            map(lambda x, y, ox, oy: x * oy - y * ox, xs, ys, oxs, oys),
+        )
@@ -1,96 +1,186 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from math import gcd, lcm
+from math import gcd
+from typing import Any
 
 
-@dataclass
 class Rational:
+    """
+    An immutable rational number ``num / den``.
+
+    Always stored normalized: ``den > 0`` and ``gcd(num, den) == 1``, so equal
+    values have equal fields and hash like the equal int when ``den == 1``.
+    Arithmetic follows the gcd tricks of `fractions.Fraction` to keep the
+    intermediate products small, with shortcuts for int operands, and
+    comparisons cross-multiply instead of bringing both to a common
+    denominator.
+    """
+
+    __slots__ = ("num", "den")
+
     num: int
     den: int
 
-    def normalize(self) -> Rational:
-        g = gcd(self.num, self.den)
-        self.num //= g
-        self.den //= g
-        return self
+    def __init__(self, num: int, den: int = 1) -> None:
+        if den == 0:
+            raise ZeroDivisionError(f"Rational({num}, 0)")
+        if den < 0:
+            num = -num
+            den = -den
+        g = gcd(num, den)
+        if g != 1:
+            num //= g
+            den //= g
+        _set_num(self, num)
+        _set_den(self, den)
+
+    @classmethod
+    def _make(cls, num: int, den: int) -> Rational:
+        # Skips the normalization for operands that are known to be normalized
+        r = object.__new__(cls)
+        _set_num(r, num)
+        _set_den(r, den)
+        return r
 
     @classmethod
     def from_int(cls, v: int) -> Rational:
-        return Rational(num=v, den=1)
+        return cls._make(v, 1)
+
+    def normalize(self) -> Rational:
+        return self
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Rational is immutable, cannot set {name}")
+
+    def __repr__(self) -> str:
+        return f"Rational(num={self.num}, den={self.den})"
+
+    def __str__(self) -> str:
+        return str(self.num) if self.den == 1 else f"{self.num}/{self.den}"
+
+    def __hash__(self) -> int:
+        if self.den == 1:
+            return hash(self.num)
+        return hash((self.num, self.den))
+
+    def __float__(self) -> float:
+        return self.num / self.den
+
+    def __bool__(self) -> bool:
+        return self.num != 0
+
+    def __neg__(self) -> Rational:
+        return Rational._make(-self.num, self.den)
+
+    def __abs__(self) -> Rational:
+        return self if self.num >= 0 else Rational._make(-self.num, self.den)
 
     def __add__(self, other: object) -> Rational:
         if isinstance(other, int):
-            return self + Rational(num=other, den=1)
-        elif isinstance(other, Rational):
-            den = lcm(self.den, other.den)
-            num = den // self.den * self.num + den // other.den * other.num
-            return Rational(num=num, den=den).normalize()
-        else:
-            raise TypeError(f"Cannot add a Rational with a {other.__class__}")
+            return Rational._make(self.num + other * self.den, self.den)
+        if not isinstance(other, Rational):
+            return NotImplemented
+        na, da = self.num, self.den
+        nb, db = other.num, other.den
+        if da == db:
+            return Rational(na + nb, da)
+        g = gcd(da, db)
+        if g == 1:
+            return Rational._make(na * db + nb * da, da * db)
+        s = da // g
+        t = na * (db // g) + nb * s
+        g2 = gcd(t, g)
+        if g2 == 1:
+            return Rational._make(t, s * db)
+        return Rational._make(t // g2, s * (db // g2))
+
+    __radd__ = __add__
 
     def __sub__(self, other: object) -> Rational:
         if isinstance(other, int):
-            return self - Rational(num=other, den=1)
-        elif isinstance(other, Rational):
-            den = lcm(self.den, other.den)
-            num = den // self.den * self.num - den // other.den * other.num
-            return Rational(num=num, den=den).normalize()
-        else:
-            raise TypeError(f"Cannot subtract a Rational with a {other.__class__}")
+            return Rational._make(self.num - other * self.den, self.den)
+        if not isinstance(other, Rational):
+            return NotImplemented
+        return self + Rational._make(-other.num, other.den)
+
+    def __rsub__(self, other: object) -> Rational:
+        if isinstance(other, int):
+            return Rational._make(other * self.den - self.num, self.den)
+        return NotImplemented
 
     def __mul__(self, other: object) -> Rational:
         if isinstance(other, int):
-            return self * Rational(num=other, den=1)
-        elif isinstance(other, Rational):
-            return Rational(
-                num=self.num * other.num, den=self.den * other.den
-            ).normalize()
-        else:
-            raise TypeError(f"Cannot multiply a Rational with a {other.__class__}")
+            g = gcd(other, self.den)
+            if g == 1:
+                return Rational._make(self.num * other, self.den)
+            return Rational._make(self.num * (other // g), self.den // g)
+        if not isinstance(other, Rational):
+            return NotImplemented
+        na, da = self.num, self.den
+        nb, db = other.num, other.den
+        g1 = gcd(na, db)
+        g2 = gcd(nb, da)
+        return Rational._make((na // g1) * (nb // g2), (da // g2) * (db // g1))
+
+    __rmul__ = __mul__
 
     def __truediv__(self, other: object) -> Rational:
         if isinstance(other, int):
-            return self * Rational(num=1, den=other)
-        elif isinstance(other, Rational):
-            return self * other.inverse()
-        else:
-            raise TypeError(f"Cannot divide a Rational with a {other.__class__}")
+            return self * Rational(1, other)
+        if not isinstance(other, Rational):
+            return NotImplemented
+        return self * other.inverse()
+
+    def __rtruediv__(self, other: object) -> Rational:
+        if isinstance(other, int):
+            return self.inverse() * other
+        return NotImplemented
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, int):
-            return self == Rational(num=other, den=1)
-        elif isinstance(other, Rational):
-            x = self.normalize()
-            y = other.normalize()
-            return x.num == y.num and x.den == y.den
-        else:
-            raise TypeError(f"Cannot compare a Rational with a {other.__class__}")
+            return self.den == 1 and self.num == other
+        if isinstance(other, Rational):
+            return self.num == other.num and self.den == other.den
+        return NotImplemented
+
+    # Denominators are positive, so a/b < c/d iff a*d < c*b.
 
     def __lt__(self, other: object) -> bool:
         if isinstance(other, int):
-            return self < Rational(num=other, den=1)
-        elif isinstance(other, Rational):
-            den = lcm(self.den, other.den)
-            self_num = den // self.den * self.num
-            other_num = den // other.den * other.num
-            return self_num < other_num
-        else:
-            raise TypeError(f"Cannot compare a Rational with a {other.__class__}")
+            return self.num < other * self.den
+        if isinstance(other, Rational):
+            return self.num * other.den < other.num * self.den
+        return NotImplemented
 
     def __le__(self, other: object) -> bool:
-        return self < other or self == other
+        if isinstance(other, int):
+            return self.num <= other * self.den
+        if isinstance(other, Rational):
+            return self.num * other.den <= other.num * self.den
+        return NotImplemented
 
     def __gt__(self, other: object) -> bool:
         if isinstance(other, int):
-            return self > Rational(num=other, den=1)
-        elif isinstance(other, Rational):
-            return other < self
-        else:
-            raise TypeError(f"Cannot compare a Rational with a {other.__class__}")
+            return self.num > other * self.den
+        if isinstance(other, Rational):
+            return self.num * other.den > other.num * self.den
+        return NotImplemented
 
     def __ge__(self, other: object) -> bool:
-        return self > other or self == other
+        if isinstance(other, int):
+            return self.num >= other * self.den
+        if isinstance(other, Rational):
+            return self.num * other.den >= other.num * self.den
+        return NotImplemented
 
     def inverse(self) -> Rational:
-        return Rational(num=self.den, den=self.num)
+        if self.num == 0:
+            raise ZeroDivisionError("inverse of Rational(0)")
+        if self.num < 0:
+            return Rational._make(-self.den, -self.num)
+        return Rational._make(self.den, self.num)
+
+
+# Slot setters that bypass the immutable __setattr__
+_set_num = Rational.__dict__["num"].__set__
+_set_den = Rational.__dict__["den"].__set__
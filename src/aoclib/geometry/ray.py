@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import heapq
+from collections.abc import Sequence
+
+from aoclib.geometry.point import Point
+from aoclib.geometry.rational import Rational
+
+
+def ray_crossing(p: Point, v: Point, q: Point, w: Point) -> tuple[int, int, int] | None:
+    """
+    Where the lines ``p + t*v`` and ``q + s*w`` of int points cross, as
+    ``(t_num, s_num, den)`` with ``t = t_num / den``, ``s = s_num / den`` and
+    ``den > 0``, or None if they are parallel.
+    """
+    den = v.cross(w)
+    if den == 0:
+        return None
+    d = q - p
+    t_num = d.cross(w)
+    s_num = d.cross(v)
+    if den < 0:
+        return -t_num, -s_num, -den
+    return t_num, s_num, den
+
+
+def rays_cross_in_box(p: Point, v: Point, q: Point, w: Point, lo: int, hi: int) -> bool:
+    """
+    Whether the rays from ``p`` along ``v`` and from ``q`` along ``w`` cross
+    at some strictly positive times inside the square ``[lo, hi]^2``.
+
+    Everything is exact int arithmetic: with the crossing at
+    ``p + v * t_num / den`` and ``den > 0``, the bound checks are multiplied
+    through by ``den`` instead of dividing.
+    """
+    crossing = ray_crossing(p, v, q, w)
+    if crossing is None:
+        return False
+    t_num, s_num, den = crossing
+    if t_num <= 0 or s_num <= 0:
+        return False
+    x = p.x * den + v.x * t_num
+    y = p.y * den + v.y * t_num
+    return lo * den <= x <= hi * den and lo * den <= y <= hi * den
+
+
+def clip_ray(p: Point, v: Point, lo: int, hi: int) -> tuple[Rational, Rational] | None:
+    """
+    The times ``t0 <= t1`` between which the ray from ``p`` along ``v`` is
+    inside ``[lo, hi]^2`` at ``t >= 0``, or None if it misses the square.
+    """
+    if v.x == 0 and v.y == 0:
+        return None
+    t0 = Rational(0)
+    t1: Rational | None = None
+    for c, dc in ((p.x, v.x), (p.y, v.y)):
+        if dc == 0:
+            if not lo <= c <= hi:
+                return None
+            continue
+        a = Rational(lo - c, dc)
+        b = Rational(hi - c, dc)
+        if a > b:
+            a, b = b, a
+        t0 = max(t0, a)
+        t1 = b if t1 is None else min(t1, b)
+    assert t1 is not None
+    if t1 <= 0 or t1 < t0:
+        return None
+    return t0, t1
+
+
+def count_crossings_in_box(
+    ps: Sequence[Point], vs: Sequence[Point], lo: int, hi: int
+) -> int:
+    """
+    The number of pairs of rays ``ps[i] + t*vs[i]`` that cross at positive
+    times inside ``[lo, hi]^2``, as counted by `rays_cross_in_box`.
+
+    Rays are clipped to the square and the resulting segments are swept from
+    left to right (Bentley-Ottmann): the segments under the sweep line are
+    kept ordered by y, and only neighbours in that order are intersected to
+    schedule the next crossing. At every event point, all segments through
+    it form one block of the order, which is reordered by slope; its pairs
+    are the crossings there. That is O((n + k) log n) comparisons for k
+    crossings of the clipped segments, plus list shifts.
+
+    Everything is exact int and `Rational` arithmetic. A shear
+    ``x' = m*x + y`` first makes every segment non-vertical, which leaves
+    crossings as they are.
+    """
+    m = max((abs(v.y) for v in vs), default=0) + 1
+    # Sheared lines through (lx, ly) with direction (dx, dy), dx > 0
+    lx: list[int] = []
+    ly: list[int] = []
+    dx: list[int] = []
+    dy: list[int] = []
+    right: list[Rational] = []  # x' of the right end
+    ids: list[int] = []  # index of the ray in ps / vs
+    # (floor of x', x', kind, y', segment); the int floor settles most heap
+    # comparisons without touching the exact x'
+    events: list[tuple[int, Rational, int, Rational, int]] = []
+
+    for i, (p, v) in enumerate(zip(ps, vs)):
+        clip = clip_ray(p, v, lo, hi)
+        if clip is None:
+            continue
+        s = len(ids)
+        ids.append(i)
+        px, py = m * p.x + p.y, p.y
+        vx, vy = m * v.x + v.y, v.y
+        lx.append(px)
+        ly.append(py)
+        seg = sorted((px + vx * t, py + vy * t) for t in clip)
+        if vx < 0:
+            vx, vy = -vx, -vy
+        dx.append(vx)
+        dy.append(vy)
+        (x0, y0), (x1, y1) = seg
+        right.append(x1)
+        events.append((x0.num // x0.den, x0, _START, y0, s))
+        events.append((x1.num // x1.den, x1, _END, y1, s))
+    heapq.heapify(events)
+
+    active: list[int] = []  # segments ordered by y just after the sweep line
+    ans = 0
+
+    def schedule(s: int, t: int, x: Rational) -> None:
+        # Queue the crossing of the lines of s and t if it is ahead
+        den = dx[s] * dy[t] - dy[s] * dx[t]
+        if den == 0:
+            return
+        t_num = (lx[t] - lx[s]) * dy[t] - (ly[t] - ly[s]) * dx[t]
+        cx = lx[s] + Rational(dx[s] * t_num, den)
+        if x < cx <= right[s] and cx <= right[t]:
+            cy = ly[s] + Rational(dy[s] * t_num, den)
+            heapq.heappush(events, (cx.num // cx.den, cx, _CROSS, cy, -1))
+
+    while events:
+        floor, x = events[0][:2]
+        a, b = x.num, x.den
+        starts: dict[Rational, list[int]] = {}
+        ends: set[int] = set()
+        points: set[Rational] = set()
+        while events and events[0][0] == floor and events[0][1] == x:
+            _, _, kind, y, s = heapq.heappop(events)
+            points.add(y)
+            if kind == _START:
+                starts.setdefault(y, []).append(s)
+            elif kind == _END:
+                ends.add(s)
+
+        for y in sorted(points):
+            c, d = y.num, y.den
+
+            # The block of segments through (x, y): y of segment s at x,
+            # times the positive dx[s] * b * d, is compared to y
+            i = 0
+            j = len(active)
+            while i < j:
+                mid = (i + j) // 2
+                s = active[mid]
+                if (ly[s] * dx[s] * b + dy[s] * (a - lx[s] * b)) * d < c * dx[s] * b:
+                    i = mid + 1
+                else:
+                    j = mid
+            j = i
+            while j < len(active):
+                s = active[j]
+                if (ly[s] * dx[s] * b + dy[s] * (a - lx[s] * b)) * d != c * dx[s] * b:
+                    break
+                j += 1
+            block = active[i:j] + starts.get(y, [])
+            for k, s in enumerate(block):
+                for t in block[k + 1 :]:
+                    if rays_cross_in_box(
+                        ps[ids[s]], vs[ids[s]], ps[ids[t]], vs[ids[t]], lo, hi
+                    ):
+                        ans += 1
+            rest = [s for s in block if s not in ends]
+            rest.sort(key=lambda s: (Rational(dy[s], dx[s]), s))
+            active[i:j] = rest
+            j = i + len(rest)
+            if i > 0 and j < len(active) and i == j:
+                schedule(active[i - 1], active[j], x)
+            if rest:
+                if i > 0:
+                    schedule(active[i - 1], active[i], x)
+                if j < len(active):
+                    schedule(active[j - 1], active[j], x)
+
+    return ans
+
+
+_START = 0
+_CROSS = 1
+_END = 2
@@ -1,45 +1,107 @@
-import sys
-
-from aoclib.graph.graph import UndiGraph
-
-
-def find_bridges(g: UndiGraph) -> list[tuple[int, int]]:
-    timer = -1
-    visited = [False for _ in range(g.n)]
-    time_in = [-1 for _ in range(g.n)]
-    low = [-1 for _ in range(g.n)]
-    # low[u] = min(
-    #     time_in[u],
-    #     time_in[p] for all p where u -> p is a back edge
-    #     low[v] for all v where u -> v is a tree edge
-    # )
-    # An edge (u, v) in the DFS tree is a bridge iff time_in[u] < low[v]
-    # Intuition: the edge (u, v) is a bridge if it is the only way to reach v
-    # from the root of the dfs tree.
-
-    bridges = []
-
-    def dfs(u: int, p: int = -1):
-        nonlocal timer
-        timer += 1
-        visited[u] = True
-        time_in[u] = timer
-        low[u] = time_in[u]
-
-        for v in g.adj[u]:
-            if v == p:
-                continue
-            if visited[v]:  # back edge
-                low[u] = min(low[u], time_in[v])
-            else:  # tree edge
-                dfs(v, u)
-                low[u] = min(low[u], low[v])
-                if time_in[u] < low[v]:
-                    bridges.append((u, v))
-
-    sys.setrecursionlimit(int(1e9))
-    for u in range(g.n):
-        if not visited[u]:
-            dfs(u)
-
-    return bridges
+from __future__ import annotations
+
+from array import array
+
+from aoclib.graph.dfs import NONTREE, PRE, dfs
+from aoclib.graph.graph import Graph, UndiGraph
+
+
+class BridgeTree:
+    """
+    Bridges, 2-edge-connected components and articulation points of an
+    undirected graph, from a single DFS. Parallel edges are supported: a second
+    copy of the tree edge back to the parent counts as a back edge.
+
+    Attributes
+    ----------
+    bridges : list[tuple[int, int]]
+        Every bridge as (parent, child) of the DFS tree.
+    comp : array[int]
+        Dense 2-edge-connected component id of every node.
+    sizes : list[int]
+        Number of nodes in every 2-edge-connected component.
+    articulation_points : list[int]
+        Nodes whose removal disconnects their connected component.
+    """
+
+    def __init__(self, g: Graph) -> None:
+        n = g.n
+        self.g = g
+        timer = -1
+        parent = array("i", [-1]) * n
+        parent_skipped = bytearray(n)
+        time_in = array("i", [-1]) * n
+        low = array("i", [-1]) * n
+        # low[u] = min(
+        #     time_in[u],
+        #     time_in[p] for all p where u -> p is a back edge
+        #     low[v] for all v where u -> v is a tree edge
+        # )
+        # An edge (u, v) in the DFS tree is a bridge iff time_in[u] < low[v]
+        # Intuition: the edge (u, v) is a bridge if it is the only way to reach v
+        # from the root of the dfs tree.
+        # Back edges never lead into a sibling subtree, so for a tree edge
+        # (u, v) that is the same as low[v] == time_in[v], which also marks v as
+        # the top node of its 2-edge-connected component.
+        is_cut = bytearray(n)
+        root_children = 0
+        stack: list[int] = []
+        comp = array("i", [-1]) * n
+        sizes: list[int] = []
+        bridges = []
+
+        for event, u, v, _ in dfs(g, nontree=True):
+            if event == PRE:  # tree edge v -> u
+                timer += 1
+                parent[u] = v
+                time_in[u] = low[u] = timer
+                stack.append(u)
+                if v != -1 and parent[v] == -1:
+                    root_children += 1
+            elif event == NONTREE:  # u -> v into a discovered node
+                if v == parent[u] and not parent_skipped[u]:
+                    parent_skipped[u] = 1  # the tree edge itself
+                elif time_in[v] < low[u]:
+                    low[u] = time_in[v]
+            else:  # POST of the tree edge v -> u
+                if low[u] == time_in[u]:
+                    if v != -1:
+                        bridges.append((v, u))
+                    c = len(sizes)
+                    size = 0
+                    while True:
+                        w = stack.pop()
+                        comp[w] = c
+                        size += 1
+                        if w == u:
+                            break
+                    sizes.append(size)
+                if v == -1:
+                    if root_children > 1:
+                        is_cut[u] = 1
+                    root_children = 0
+                    continue
+                if low[u] < low[v]:
+                    low[v] = low[u]
+                if parent[v] != -1 and time_in[v] <= low[u]:
+                    is_cut[v] = 1
+
+        self.bridges = bridges
+        self.comp = comp
+        self.sizes = sizes
+        self.num_comps = len(sizes)
+        self.articulation_points = [u for u in range(n) if is_cut[u]]
+
+    def tree(self) -> UndiGraph:
+        """
+        The bridge tree: one node per 2-edge-connected component and one edge
+        per bridge. It is a forest if the graph is disconnected.
+        """
+        t = UndiGraph(self.num_comps)
+        for u, v in self.bridges:
+            t.add_edge(self.comp[u], self.comp[v])
+        return t
+
+
+def find_bridges(g: Graph) -> list[tuple[int, int]]:
+    return BridgeTree(g).bridges
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from enum import IntEnum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aoclib.graph.graph import Graph
+
+
+class DfsEvent(IntEnum):
+    PRE = 0  # (PRE, v, u, i): v is discovered through the i-th edge of u
+    POST = 1  # (POST, v, u, i): v is finished; u, i as in its PRE event
+    NONTREE = 2  # (NONTREE, u, v, i): the i-th edge u -> v hits a discovered v
+
+
+DfsStep = tuple[DfsEvent, int, int, int]
+
+PRE = DfsEvent.PRE
+POST = DfsEvent.POST
+NONTREE = DfsEvent.NONTREE
+
+
+def dfs(
+    g: Graph,
+    roots: Iterable[int] | None = None,
+    nontree: bool = False,
+) -> Iterator[DfsStep]:
+    """
+    Explicit-stack depth first search over ``g``.
+
+    Roots are tried in order (all nodes by default) and every undiscovered one
+    starts a new tree; a root is reported with ``u = i = -1``. Edges leading to
+    already discovered nodes are only reported when ``nontree`` is set.
+    Neighbours are visited in ``adj`` order, so the events are exactly those of
+    the textbook recursive DFS, without any recursion.
+    """
+    adj = g.adj
+    visited = bytearray(g.n)
+
+    for root in range(g.n) if roots is None else roots:
+        if visited[root]:
+            continue
+        visited[root] = 1
+        yield PRE, root, -1, -1
+
+        # One frame per node on the current path: the node, its neighbours,
+        # and the cursor to the next edge to try.
+        nodes = [root]
+        nbrs = [adj[root]]
+        cursor = [0]
+
+        while nodes:
+            i = cursor[-1]
+            vs = nbrs[-1]
+            if i < len(vs):
+                cursor[-1] = i + 1
+                v = vs[i]
+                if visited[v]:
+                    if nontree:
+                        yield NONTREE, nodes[-1], v, i
+                    continue
+                visited[v] = 1
+                yield PRE, v, nodes[-1], i
+                nodes.append(v)
+                nbrs.append(adj[v])
+                cursor.append(0)
+            else:
+                v = nodes.pop()
+                nbrs.pop()
+                cursor.pop()
+                if nodes:
+                    yield POST, v, nodes[-1], cursor[-1] - 1
+                else:
+                    yield POST, v, -1, -1
@@ -1,6 +1,23 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from array import array
+from collections.abc import Iterable, Sequence
+from itertools import chain
+from typing import Protocol, overload
+
+from aoclib.graph.dfs import POST, dfs
+
+
+class Graph(Protocol):
+    """Anything with ``n`` nodes and an adjacency ``adj[u] -> [v, ...]``."""
+
+    @property
+    def n(self) -> int:
+        ...
+
+    @property
+    def adj(self) -> Sequence[Sequence[int]]:
+        ...
 
 
 class UndiGraph:
@@ -12,6 +29,9 @@ class UndiGraph:
         self.adj[u].append(v)
         self.adj[v].append(u)
 
+    def freeze(self) -> CSRGraph:
+        return CSRGraph.from_adj(self.adj)
+
 
 class DiGraph:
     def __init__(self, n: int) -> None:
@@ -22,23 +42,7 @@ class DiGraph:
         self.adj[u].append(v)
 
     def topo_sort(self) -> Sequence[int]:
-        mark = [0 for _ in range(self.n)]
-        order = []
-
-        def dfs(u: int) -> None:
-            mark[u] = 1
-            for v in self.adj[u]:
-                if mark[v] == 0:
-                    dfs(v)
-            mark[u] = 2
-            order.append(u)
-
-        for u in range(self.n):
-            if mark[u] == 0:
-                dfs(u)
-
-        order.reverse()
-        return order
+        return topo_sort(self)
 
     def reverse(self) -> DiGraph:
         gt = DiGraph(self.n)
@@ -48,3 +52,108 @@ class DiGraph:
                 gt.add_edge(v, u)
 
         return gt
+
+    def freeze(self) -> CSRGraph:
+        return CSRGraph.from_adj(self.adj)
+
+
+class CSRAdj(Sequence[Sequence[int]]):
+    """Read-only ``adj`` view over the buffers of a `CSRGraph`."""
+
+    def __init__(self, offsets: array[int], targets: array[int]) -> None:
+        self.offsets = offsets
+        self.targets = memoryview(targets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, u: int) -> memoryview:
+        ...
+
+    @overload
+    def __getitem__(self, u: slice) -> list[memoryview]:
+        ...
+
+    def __getitem__(self, u: int | slice) -> memoryview | list[memoryview]:
+        if isinstance(u, slice):
+            return [self[i] for i in range(*u.indices(len(self)))]
+        return self.targets[self.offsets[u] : self.offsets[u + 1]]
+
+
+class CSRGraph:
+    """
+    Immutable graph in compressed sparse row form.
+
+    The out-neighbours of ``u`` are ``targets[offsets[u]:offsets[u + 1]]``. An
+    undirected graph is stored with both directions of every edge, exactly like
+    `UndiGraph`, so the edge at index ``i`` and its position in ``adj[u]`` agree.
+
+    Attributes
+    ----------
+    offsets : array[int]
+        ``n + 1`` prefix offsets into ``targets``.
+    targets : array[int]
+        The head of every edge, grouped by tail.
+    """
+
+    def __init__(self, offsets: array[int], targets: array[int]) -> None:
+        assert len(offsets) > 0 and offsets[-1] == len(targets)
+        self.n = len(offsets) - 1
+        self.offsets = offsets
+        self.targets = targets
+        self.adj = CSRAdj(offsets, targets)
+
+    @classmethod
+    def from_adj(cls, adj: Sequence[Sequence[int]]) -> CSRGraph:
+        offsets = array("i", bytes(4 * (len(adj) + 1)))
+        total = 0
+        for u, vs in enumerate(adj):
+            total += len(vs)
+            offsets[u + 1] = total
+        targets = array("i", chain.from_iterable(adj))
+        return cls(offsets, targets)
+
+    @classmethod
+    def from_edges(cls, n: int, src: Sequence[int], dst: Sequence[int]) -> CSRGraph:
+        """Builds the graph with edges ``src[i] -> dst[i]`` by counting sort."""
+        assert len(src) == len(dst)
+        offsets = array("i", bytes(4 * (n + 1)))
+        for u in src:
+            offsets[u + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+        pos = offsets[:-1]
+        targets = array("i", bytes(4 * len(dst)))
+        for u, v in zip(src, dst):
+            targets[pos[u]] = v
+            pos[u] += 1
+        return cls(offsets, targets)
+
+    @property
+    def m(self) -> int:
+        return len(self.targets)
+
+    def edges(self) -> Iterable[tuple[int, int]]:
+        offsets = self.offsets
+        targets = self.targets
+        for u in range(self.n):
+            for i in range(offsets[u], offsets[u + 1]):
+                yield u, targets[i]
+
+    def topo_sort(self) -> Sequence[int]:
+        return topo_sort(self)
+
+    def reverse(self) -> CSRGraph:
+        src = array("i", bytes(4 * self.m))
+        offsets = self.offsets
+        for u in range(self.n):
+            for i in range(offsets[u], offsets[u + 1]):
+                src[i] = u
+        return CSRGraph.from_edges(self.n, self.targets, src)
+
+
+def topo_sort(g: Graph) -> Sequence[int]:
+    order = [u for event, u, _, _ in dfs(g) if event == POST]
+    order.reverse()
+    return order
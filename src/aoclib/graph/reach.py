@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from aoclib.graph.graph import Graph, topo_sort
+
+
+def reachable_union(
+    dag: Graph,
+    payload: Sequence[int],
+    order: Sequence[int] | None = None,
+) -> list[int]:
+    """
+    For every node ``u`` of ``dag``, the union of ``payload[v]`` over all ``v``
+    reachable from ``u`` (``u`` included), with payloads encoded as int bitsets.
+
+    ``order`` is a topological order of ``dag``; it is computed when omitted.
+    `SCC.condensation` numbers its nodes topologically, so ``range(n)`` can be
+    passed as is.
+    """
+    if order is None:
+        order = topo_sort(dag)
+    adj = dag.adj
+    union = list(payload)
+    # Going backwards, every successor is complete before it is needed.
+    for u in reversed(order):
+        acc = union[u]
+        for v in adj[u]:
+            acc |= union[v]
+        union[u] = acc
+    return union
+
+
+def reachable_count(
+    dag: Graph,
+    payload: Sequence[int],
+    order: Sequence[int] | None = None,
+) -> list[int]:
+    """The popcount of every `reachable_union`."""
+    return [bits.bit_count() for bits in reachable_union(dag, payload, order)]
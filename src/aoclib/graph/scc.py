@@ -1,32 +1,92 @@
-import sys
+from __future__ import annotations
+
+from array import array
 from collections.abc import Sequence
 
-from aoclib.graph.graph import DiGraph
+from aoclib.graph.dfs import NONTREE, PRE, dfs
+from aoclib.graph.graph import CSRGraph, DiGraph
 
 
 class SCC:
-    def __init__(self, g: DiGraph) -> None:
+    """
+    Strongly connected components by a single pass of Tarjan's algorithm.
+
+    Attributes
+    ----------
+    comp : array[int]
+        Dense component id of every node. Ids are numbered in topological order
+        of the condensation: every edge u -> v has ``comp[u] <= comp[v]``.
+    sizes : list[int]
+        Number of nodes in every component.
+    """
+
+    def __init__(self, g: DiGraph | CSRGraph) -> None:
         self.g = g
-        self.gt = g.reverse()
+        n = g.n
+        time_in = array("i", bytes(4 * n))
+        low = array("i", bytes(4 * n))
+        on_stack = bytearray(n)
+        stack: list[int] = []
+        timer = 0
+        # Tarjan closes the components sinks first, so they are numbered
+        # backwards from n and shifted down to 0 at the end.
+        comp = array("i", bytes(4 * n))
+        next_id = n
+        self.leaders = [_ for _ in range(n)]
+
+        for event, u, v, _ in dfs(g, nontree=True):
+            if event == PRE:  # tree edge v -> u
+                time_in[u] = low[u] = timer
+                timer += 1
+                stack.append(u)
+                on_stack[u] = 1
+            elif event == NONTREE:  # u -> v into a discovered node
+                if on_stack[v] and time_in[v] < low[u]:
+                    low[u] = time_in[v]
+            else:  # POST of the tree edge v -> u
+                if low[u] == time_in[u]:
+                    next_id -= 1
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        comp[w] = next_id
+                        self.leaders[w] = u
+                        if w == u:
+                            break
+                if v != -1 and low[u] < low[v]:
+                    low[v] = low[u]
+
+        self.num_comps = n - next_id
+        self.sizes = [0 for _ in range(self.num_comps)]
+        for u in range(n):
+            comp[u] -= next_id
+            self.sizes[comp[u]] += 1
+        self.comp = comp
 
     def scc(self) -> Sequence[int]:
-        sys.setrecursionlimit(int(1e9))
-        mark = [0 for _ in range(self.g.n)]
-        leaders = [_ for _ in range(self.g.n)]
-
-        def dfs(u: int, leader: int) -> None:
-            mark[u] = 1
-            leaders[u] = leader
-            for v in self.gt.adj[u]:
-                if mark[v] == 0:
-                    dfs(v, leader)
-            mark[u] = 2
-
-        topo_order = self.g.topo_sort()
-        assert len(topo_order) == self.g.n
-        assert len(topo_order) == self.gt.n
-        for u in topo_order:
-            if mark[u] == 0:
-                dfs(u, u)
-
-        return leaders
+        """Returns, for every node, a representative node of its component."""
+        return self.leaders
+
+    def members(self) -> list[list[int]]:
+        members: list[list[int]] = [[] for _ in range(self.num_comps)]
+        for u, c in enumerate(self.comp):
+            members[c].append(u)
+        return members
+
+    def condensation(self) -> DiGraph:
+        """
+        The DAG of components, without self loops or parallel edges. Nodes are
+        component ids, so ``range(num_comps)`` is already a topological order.
+        """
+        comp = self.comp
+        adj = self.g.adj
+        dag = DiGraph(self.num_comps)
+        last_src = array("i", [-1]) * self.num_comps
+        for cu, us in enumerate(self.members()):
+            for u in us:
+                for v in adj[u]:
+                    cv = comp[v]
+                    if cv != cu and last_src[cv] != cu:
+                        last_src[cv] = cu
+                        dag.add_edge(cu, cv)
+        return dag
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from collections.abc import Callable, Iterable
+
+INF = 1 << 62
+
+# Above this maximum edge weight the heap is used instead of Dial's buckets.
+DIAL_MAX_WEIGHT = 64
+
+Successors = Callable[[int], Iterable[tuple[int, int]]]
+
+
+def shortest_path(
+    n: int,
+    sources: Iterable[int],
+    successors: Successors,
+    is_target: Callable[[int], bool] | None = None,
+    max_weight: int | None = None,
+    heuristic: Callable[[int], int] | None = None,
+    use_buckets: bool | None = None,
+) -> tuple[array[int], int]:
+    """
+    Single or multi-source shortest paths over the int states ``0..n-1``.
+
+    ``successors(u)`` yields ``(v, w)`` pairs with non-negative weights ``w``.
+    Returns the distance array (``INF`` where unreached) and the first target
+    settled, or -1 if there is none; the search stops at that target.
+
+    With a small ``max_weight`` bound on the edge weights the search runs on a
+    circular bucket queue (Dial's algorithm), otherwise on a binary heap.
+    ``use_buckets`` overrides that choice: True forces the buckets (which
+    needs ``max_weight`` and no heuristic), False the heap. A ``heuristic``
+    turns the heap search into A*; it must be consistent, and only distances
+    of settled states are final in that case.
+    """
+    dist = array("q", [INF]) * n
+    if use_buckets is None:
+        use_buckets = (
+            heuristic is None
+            and max_weight is not None
+            and max_weight <= DIAL_MAX_WEIGHT
+        )
+    if use_buckets:
+        assert max_weight is not None, "Dial's buckets need max_weight"
+        assert heuristic is None, "A* runs on the heap"
+        return dist, _dial(dist, sources, successors, is_target, max_weight)
+    return dist, _heap(dist, sources, successors, is_target, heuristic)
+
+
+def _dial(
+    dist: array[int],
+    sources: Iterable[int],
+    successors: Successors,
+    is_target: Callable[[int], bool] | None,
+    max_weight: int,
+) -> int:
+    # Every pending key lies in [d, d + max_weight], so max_weight + 1 buckets
+    # indexed by key modulo their count never collide.
+    num_buckets = max_weight + 1
+    buckets: list[list[int]] = [[] for _ in range(num_buckets)]
+    pending = 0
+    for s in sources:
+        dist[s] = 0
+        buckets[0].append(s)
+        pending += 1
+
+    d = 0
+    while pending > 0:
+        bucket = buckets[d % num_buckets]
+        while bucket:
+            u = bucket.pop()
+            pending -= 1
+            if dist[u] != d:
+                continue
+            if is_target is not None and is_target(u):
+                return u
+            for v, w in successors(u):
+                # A heavier edge would wrap around into a bucket popped too early
+                assert w <= max_weight, f"edge weight {w} above max_weight"
+                nd = d + w
+                if nd < dist[v]:
+                    dist[v] = nd
+                    buckets[nd % num_buckets].append(v)
+                    pending += 1
+        d += 1
+
+    return -1
+
+
+def _heap(
+    dist: array[int],
+    sources: Iterable[int],
+    successors: Successors,
+    is_target: Callable[[int], bool] | None,
+    heuristic: Callable[[int], int] | None,
+) -> int:
+    q: list[tuple[int, int, int]] = []  # (key, distance, state)
+    for s in sources:
+        dist[s] = 0
+        heapq.heappush(q, (0 if heuristic is None else heuristic(s), 0, s))
+
+    while q:
+        _, d, u = heapq.heappop(q)
+        if dist[u] != d:
+            continue
+        if is_target is not None and is_target(u):
+            return u
+        for v, w in successors(u):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                key = nd if heuristic is None else nd + heuristic(v)
+                heapq.heappush(q, (key, nd, v))
+
+    return -1
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from enum import IntEnum
 from typing import NamedTuple
 
@@ -12,26 +13,20 @@ class Di4(IntEnum):
     R = 3
 
 
+# Indexed by Di4
+DR = (-1, 1, 0, 0)
+DC = (0, 0, -1, 1)
+TURN_LEFT = (Di4.L, Di4.R, Di4.D, Di4.U)
+TURN_RIGHT = (Di4.R, Di4.L, Di4.U, Di4.D)
+REVERSE = (Di4.D, Di4.U, Di4.R, Di4.L)
+
+
 def turn_left(d: Di4) -> Di4:
-    if d == Di4.U:
-        return Di4.L
-    elif d == Di4.L:
-        return Di4.D
-    elif d == Di4.D:
-        return Di4.R
-    else:
-        return Di4.U
+    return TURN_LEFT[d]
 
 
 def turn_right(d: Di4) -> Di4:
-    if d == Di4.U:
-        return Di4.R
-    elif d == Di4.R:
-        return Di4.D
-    elif d == Di4.D:
-        return Di4.L
-    else:
-        return Di4.U
+    return TURN_RIGHT[d]
 
 
 class Pos(NamedTuple):
@@ -42,15 +37,7 @@ class Pos(NamedTuple):
         return 0 <= self.r < len(g) and 0 <= self.c < len(g[0])
 
     def go(self, d: Di4) -> Pos:
-        if d == Di4.U:
-            return Pos(self.r - 1, self.c)
-        if d == Di4.D:
-            return Pos(self.r + 1, self.c)
-        if d == Di4.L:
-            return Pos(self.r, self.c - 1)
-        if d == Di4.R:
-            return Pos(self.r, self.c + 1)
-        assert False
+        return Pos(self.r + DR[d], self.c + DC[d])
 
     def manhattan(self, other: Pos) -> int:
         return abs(self.r - other.r) + abs(self.c - other.c)
@@ -64,9 +51,248 @@ class State(NamedTuple):
         return f"State(pos={tuple(self.pos)},dir={Di4(self.dir).name})"
 
 
+class StateSpace:
+    """
+    Dense int ids for the states ``(r, c, dir[, extra])`` of an ``h x w`` grid,
+    so that search loops can work on ints and flat arrays.
+
+    ``cell = r * w + c`` and ``id = (cell * 4 + dir) * extra_size + extra``. The
+    move tables are indexed by ``cell * 4 + dir`` and hold ``OUT`` whenever the
+    move leaves the grid.
+
+    Attributes
+    ----------
+    neighbor : array[int]
+        ``neighbor[cell * 4 + d]`` is the cell one step from ``cell`` towards
+        ``d``.
+    """
+
+    OUT = -1
+
+    def __init__(self, h: int, w: int, extra_size: int = 1) -> None:
+        self.h = h
+        self.w = w
+        self.extra_size = extra_size
+        self.num_cells = h * w
+        self.size = self.num_cells * len(Di4) * extra_size
+        neighbor = array("i", [self.OUT]) * (self.num_cells * len(Di4))
+        for r in range(h):
+            for c in range(w):
+                base = (r * w + c) * 4
+                for d in Di4:
+                    rr = r + DR[d]
+                    cc = c + DC[d]
+                    if 0 <= rr < h and 0 <= cc < w:
+                        neighbor[base + d] = rr * w + cc
+        self.neighbor = neighbor
+
+    def cell(self, r: int, c: int) -> int:
+        return r * self.w + c
+
+    def encode(self, r: int, c: int, d: int, extra: int = 0) -> int:
+        return ((r * self.w + c) * 4 + d) * self.extra_size + extra
+
+    def decode(self, s: int) -> tuple[int, int, Di4, int]:
+        s, extra = divmod(s, self.extra_size)
+        cell, d = divmod(s, 4)
+        r, c = divmod(cell, self.w)
+        return r, c, Di4(d), extra
+
+    def from_state(self, state: State) -> int:
+        return self.encode(state.pos.r, state.pos.c, state.dir)
+
+    def to_state(self, s: int) -> State:
+        r, c, d, _ = self.decode(s)
+        return State(Pos(r, c), d)
+
+    def go(self, s: int, d: int) -> int:
+        """
+        The state one cell from ``s`` towards ``d``, facing ``d`` and with the
+        extra part of ``s`` kept, or ``OUT``.
+        """
+        s, extra = divmod(s, self.extra_size)
+        cell = self.neighbor[s // 4 * 4 + d]
+        if cell == self.OUT:
+            return self.OUT
+        return (cell * 4 + d) * self.extra_size + extra
+
+
 def parse_grid(input: str) -> list[list[str]]:
     return [[c for c in line] for line in input.splitlines()]
 
 
 def format_grid(g: list[list[str]]):
     return "\n".join(["".join([c for c in line]) for line in g])
+
+
+class Grid:
+    """
+    A rectangular character grid in one flat ``bytearray``.
+
+    Cell ``(r, c)`` lives at flat index ``r * stride + c``. Grids parsed from
+    text keep their newlines, so ``stride == w + 1`` and the extra column of
+    ``"\n"`` bytes doubles as a wall for moves that leave a row sideways.
+
+    Attributes
+    ----------
+    h : int
+        Number of rows.
+    w : int
+        Number of columns.
+    stride : int
+        Distance between the flat indices of vertically adjacent cells.
+    data : bytearray
+        The raw cells; ``data[i]`` is the byte value of the cell at index ``i``.
+    """
+
+    def __init__(self, h: int, w: int, fill: str = ".", stride: int | None = None):
+        self.h = h
+        self.w = w
+        self.stride = w + 1 if stride is None else stride
+        assert self.stride >= w
+        row = fill.encode() * w + b"\n" * (self.stride - w)
+        self.data = bytearray(row * h)
+
+    @classmethod
+    def parse(cls, input: str) -> Grid:
+        lines = input.splitlines()
+        grid = cls(0, len(lines[0]) if lines else 0)
+        assert all(len(line) == grid.w for line in lines)
+        grid.h = len(lines)
+        grid.data = bytearray("".join(line + "\n" for line in lines).encode())
+        assert len(grid.data) == grid.h * grid.stride
+        return grid
+
+    @classmethod
+    def from_list(cls, g: Sequence[Sequence[str]]) -> Grid:
+        return cls.parse("\n".join("".join(row) for row in g))
+
+    def to_list(self) -> list[list[str]]:
+        return [[chr(b) for b in self.row(r)] for r in range(self.h)]
+
+    def __str__(self) -> str:
+        return "\n".join(self.row(r).tobytes().decode() for r in range(self.h))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return (self.h, self.w) == (other.h, other.w) and all(
+            self.row(r) == other.row(r) for r in range(self.h)
+        )
+
+    def copy(self) -> Grid:
+        grid = Grid(0, self.w, stride=self.stride)
+        grid.h = self.h
+        grid.data = bytearray(self.data)
+        return grid
+
+    def index(self, r: int, c: int) -> int:
+        return r * self.stride + c
+
+    def pos(self, i: int) -> Pos:
+        return Pos(*divmod(i, self.stride))
+
+    def inside(self, r: int, c: int) -> bool:
+        return 0 <= r < self.h and 0 <= c < self.w
+
+    def __getitem__(self, p: tuple[int, int]) -> str:
+        r, c = p
+        assert self.inside(r, c)
+        return chr(self.data[r * self.stride + c])
+
+    def __setitem__(self, p: tuple[int, int], ch: str) -> None:
+        r, c = p
+        assert self.inside(r, c)
+        self.data[r * self.stride + c] = ord(ch)
+
+    def row(self, r: int) -> memoryview:
+        start = r * self.stride
+        return memoryview(self.data)[start : start + self.w]
+
+    def col(self, c: int) -> memoryview:
+        return memoryview(self.data)[c : self.h * self.stride : self.stride]
+
+    def find(self, ch: str) -> Pos | None:
+        i = self.data.find(ord(ch))
+        return None if i == -1 else self.pos(i)
+
+    def find_all(self, ch: str) -> Iterator[Pos]:
+        b = ord(ch)
+        i = self.data.find(b)
+        while i != -1:
+            yield self.pos(i)
+            i = self.data.find(b, i + 1)
+
+
+UNREACHED = -1
+
+
+def byte_table(passable: str | bytes | Callable[[str], bool]) -> bytearray:
+    """A 256-entry lookup of the passable bytes; newlines are never passable."""
+    if callable(passable):
+        table = bytearray(passable(chr(b)) for b in range(256))
+    else:
+        table = bytearray(256)
+        for b in passable.encode() if isinstance(passable, str) else passable:
+            table[b] = 1
+    table[ord("\n")] = 0
+    return table
+
+
+def grid_bfs(
+    grid: Grid,
+    sources: Iterable[tuple[int, int]],
+    passable: str | bytes | Callable[[str], bool],
+    max_depth: int | None = None,
+) -> array[int]:
+    """
+    Multi-source BFS over the 4-neighbourhood of ``grid``.
+
+    Returns the distance from the nearest source for every flat index of the
+    grid (``UNREACHED`` if not reached). Sources are always reached, whatever
+    their cell; every other cell must be ``passable``, given as the passable
+    characters or a predicate on them. The search stops after ``max_depth``
+    levels.
+    """
+    # The wall column of newlines stops sideways moves, and the bounds check
+    # catches the rest.
+    assert grid.stride > grid.w
+    table = byte_table(passable)
+    data = grid.data
+    stride = grid.stride
+    size = len(data)
+    dist = array("i", [UNREACHED]) * size
+
+    frontier = []
+    for r, c in sources:
+        i = grid.index(r, c)
+        if dist[i] == UNREACHED:
+            dist[i] = 0
+            frontier.append(i)
+
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = []
+        for i in frontier:
+            for j in (i - stride, i + stride, i - 1, i + 1):
+                if 0 <= j < size and dist[j] == UNREACHED and table[data[j]]:
+                    dist[j] = depth
+                    next_frontier.append(j)
+        frontier = next_frontier
+
+    return dist
+
+
+def parity_counts(dist: Sequence[int], max_depth: int | None = None) -> list[int]:
+    """
+    The number of reached cells at even and odd distance (up to ``max_depth``).
+
+    A cell at distance d can be stood on after exactly k >= d steps whenever k
+    and d have the same parity, by walking back and forth.
+    """
+    counts = [0, 0]
+    for d in dist:
+        if d != UNREACHED and (max_depth is None or d <= max_depth):
+            counts[d & 1] += 1
+    return counts
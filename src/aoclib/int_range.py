@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from heapq import merge
 from typing import NamedTuple
 
 
@@ -24,3 +27,119 @@ class IntRange(NamedTuple):
         new_low = max(self.low, them.low)
         new_high = min(self.high, them.high)
         return IntRange(new_low, new_high)
+
+
+class IntervalSet:
+    """
+    A set of ints stored as sorted, disjoint and non-adjacent `IntRange`s.
+
+    Point lookups bisect on the range lows in O(log n); set algebra between two
+    interval sets merges their sorted ranges in linear time.
+    """
+
+    def __init__(self, ranges: Iterable[IntRange] = ()) -> None:
+        self.ranges = _coalesce(sorted(r for r in ranges if r.low <= r.high))
+        self._lows = [r.low for r in self.ranges]
+
+    @classmethod
+    def _from_sorted(cls, ranges: Iterable[IntRange]) -> IntervalSet:
+        """Builds the set from ranges already sorted by low, skipping the sort."""
+        s = cls.__new__(cls)
+        s.ranges = _coalesce(ranges)
+        s._lows = [r.low for r in s.ranges]
+        return s
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({self.ranges})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self.ranges == other.ranges
+
+    def __iter__(self) -> Iterator[IntRange]:
+        return iter(self.ranges)
+
+    def __bool__(self) -> bool:
+        return len(self.ranges) > 0
+
+    @property
+    def len(self) -> int:
+        return sum(r.len for r in self.ranges)
+
+    @property
+    def low(self) -> int:
+        return self.ranges[0].low
+
+    @property
+    def high(self) -> int:
+        return self.ranges[-1].high
+
+    def find(self, val: int) -> IntRange | None:
+        i = bisect_right(self._lows, val) - 1
+        if i >= 0 and val <= self.ranges[i].high:
+            return self.ranges[i]
+        return None
+
+    def contains(self, val: int) -> bool:
+        return self.find(val) is not None
+
+    def union(self, them: IntervalSet) -> IntervalSet:
+        return IntervalSet._from_sorted(merge(self.ranges, them.ranges))
+
+    def intersection(self, them: IntervalSet) -> IntervalSet:
+        res = []
+        i = j = 0
+        a = self.ranges
+        b = them.ranges
+        while i < len(a) and j < len(b):
+            overlap = a[i].join(b[j])
+            if overlap is not None:
+                res.append(overlap)
+            if a[i].high < b[j].high:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet._from_sorted(res)
+
+    def difference(self, them: IntervalSet) -> IntervalSet:
+        res = []
+        j = 0
+        b = them.ranges
+        for r in self.ranges:
+            low = r.low
+            while j < len(b) and b[j].high < low:
+                j += 1
+            k = j
+            while k < len(b) and b[k].low <= r.high:
+                if low < b[k].low:
+                    res.append(IntRange(low, b[k].low - 1))
+                low = b[k].high + 1
+                k += 1
+            if low <= r.high:
+                res.append(IntRange(low, r.high))
+        return IntervalSet._from_sorted(res)
+
+    def complement(self, bound: IntRange) -> IntervalSet:
+        return IntervalSet([bound]).difference(self)
+
+    def shift(self, delta: int) -> IntervalSet:
+        return IntervalSet._from_sorted(
+            IntRange(r.low + delta, r.high + delta) for r in self.ranges
+        )
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+
+def _coalesce(ranges: Iterable[IntRange]) -> list[IntRange]:
+    """Merges overlapping or adjacent ranges, given sorted by low."""
+    res: list[IntRange] = []
+    for r in ranges:
+        if res and r.low <= res[-1].high + 1:
+            if r.high > res[-1].high:
+                res[-1] = IntRange(res[-1].low, r.high)
+        else:
+            res.append(r)
+    return res
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from fractions import Fraction
+
+Matrix = list[list[Fraction]]
+
+
+def to_matrix(rows: Sequence[Sequence[int | Fraction]]) -> Matrix:
+    return [[Fraction(x) for x in row] for row in rows]
+
+
+def row_reduce(a: Matrix) -> list[int]:
+    """
+    Brings ``a`` to reduced row echelon form in place by exact Gauss-Jordan
+    elimination. Returns the pivot column of every nonzero row, in order.
+    """
+    pivots: list[int] = []
+    num_rows = len(a)
+    num_cols = len(a[0]) if a else 0
+    r = 0
+    for c in range(num_cols):
+        if r == num_rows:
+            break
+        p = next((i for i in range(r, num_rows) if a[i][c] != 0), -1)
+        if p == -1:
+            continue
+        a[r], a[p] = a[p], a[r]
+        row = a[r]
+        inv = 1 / row[c]
+        for j in range(c, num_cols):
+            row[j] *= inv
+        for i in range(num_rows):
+            if i != r and a[i][c] != 0:
+                f = a[i][c]
+                other = a[i]
+                for j in range(c, num_cols):
+                    other[j] -= f * row[j]
+        pivots.append(c)
+        r += 1
+    return pivots
+
+
+def solve(
+    a: Sequence[Sequence[int | Fraction]], b: Sequence[int | Fraction]
+) -> list[Fraction] | None:
+    """
+    The unique solution ``x`` of ``a x = b`` over the rationals, or None if
+    the system has no solution or more than one.
+    """
+    n = len(a[0])
+    aug = to_matrix([[*row, rhs] for row, rhs in zip(a, b)])
+    pivots = row_reduce(aug)
+    if pivots != list(range(n)):
+        # Missing a pivot leaves a free variable, one on b is inconsistent
+        return None
+    return [aug[i][n] for i in range(n)]
@@ -1,23 +1,71 @@
+from __future__ import annotations
+
+from array import array
+
+
 class DSU:
-    def __init__(self, n: int):
+    """
+    Disjoint set union with union by size.
+
+    By default ``find`` compresses paths. With ``rollback=True`` it does not, so
+    that every ``merge`` changes exactly one leader and can be undone with
+    ``snapshot``/``rollback``; finds are still O(log n) thanks to union by size.
+    """
+
+    def __init__(self, n: int, rollback: bool = False):
         self.n = n
-        self.leader = [i for i in range(n)]
-        self.depth = [0 for _ in range(n)]
+        self.rollback_mode = rollback
+        self.leader = array("i", range(n))
+        self.sz = array("i", [1]) * n
+        self.num_components = n
+        # Roots attached to another root by merge, in order (rollback mode only)
+        self.history: list[int] = []
 
     def find(self, u: int) -> int:
-        while self.leader[u] != u:
-            u = self.leader[u]
-        return u
+        leader = self.leader
+        root = u
+        while leader[root] != root:
+            root = leader[root]
+        if not self.rollback_mode:
+            while leader[u] != root:
+                leader[u], u = root, leader[u]
+        return root
+
+    def same(self, u: int, v: int) -> bool:
+        return self.find(u) == self.find(v)
+
+    def size(self, u: int) -> int:
+        return self.sz[self.find(u)]
 
     def merge(self, u: int, v: int) -> bool:
         u = self.find(u)
         v = self.find(v)
         if u == v:
             return False
-        if self.depth[u] < self.depth[v]:
-            self.leader[u] = v
-        else:
-            self.leader[v] = u
-            if self.depth[u] == self.depth[v]:
-                self.depth[u] += 1
+        if self.sz[u] < self.sz[v]:
+            u, v = v, u
+        self.leader[v] = u
+        self.sz[u] += self.sz[v]
+        self.num_components -= 1
+        if self.rollback_mode:
+            self.history.append(v)
         return True
+
+    def snapshot(self) -> int:
+        assert self.rollback_mode, "snapshot() needs DSU(n, rollback=True)"
+        return len(self.history)
+
+    def rollback(self, snapshot: int) -> None:
+        """Undoes every merge done after ``snapshot()`` returned ``snapshot``."""
+        assert self.rollback_mode, "rollback() needs DSU(n, rollback=True)"
+        assert 0 <= snapshot <= len(self.history)
+        while len(self.history) > snapshot:
+            v = self.history.pop()
+            u = self.leader[v]
+            self.sz[u] -= self.sz[v]
+            self.leader[v] = v
+            self.num_components += 1
+
+    def components(self) -> list[int]:
+        """The size of every component."""
+        return [self.sz[u] for u in range(self.n) if self.leader[u] == u]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+import pytest
+
+from aoclib.box import Box, BoxIndex, Region
+
+
+def points(box: Box | None) -> set[tuple[int, ...]]:
+    if box is None:
+        return set()
+    return set(
+        itertools.product(*(range(lo, hi + 1) for lo, hi in zip(box.lo, box.hi)))
+    )
+
+
+def random_box(rng: random.Random, dim: int) -> Box:
+    # High corners may fall below low ones, making empty boxes
+    lo = tuple(rng.randint(0, 5) for _ in range(dim))
+    return Box(lo, tuple(x + rng.randint(-1, 4) for x in lo))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_box(seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(200):
+        dim = rng.randint(1, 3)
+        a = random_box(rng, dim)
+        b = random_box(rng, dim)
+        pa = points(a)
+        assert a.volume == len(pa)
+        assert a.empty == (not pa)
+        assert points(a.intersect(b)) == pa & points(b)
+
+        axis = rng.randrange(dim)
+        threshold = rng.randint(-1, 9)
+        below, above = a.split(axis, threshold)
+        assert points(below) == {p for p in pa if p[axis] < threshold}
+        assert points(above) == {p for p in pa if p[axis] >= threshold}
+
+        if not a.empty:
+            pieces = a.difference(b)
+            assert len(pieces) <= 2 * dim
+            assert sum(p.volume for p in pieces) == len(pa - points(b))
+            assert set().union(*map(points, pieces)) == pa - points(b)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_region(seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(25):
+        dim = rng.randint(1, 3)
+        boxes = [random_box(rng, dim) for _ in range(rng.randint(0, 8))]
+        region = Region(boxes)
+        covered = set().union(*map(points, boxes))
+        # The union is stored as disjoint boxes, so the volume is exact
+        assert region.volume == len(covered)
+        pieces = list(map(points, region))
+        assert sum(map(len, pieces)) == len(set().union(*pieces))
+
+        index = BoxIndex(region, leaf_size=rng.randint(1, 4))
+        for p in itertools.product(range(-1, 11), repeat=dim):
+            assert region.contains(p) == (p in covered)
+            found = index.find(p)
+            assert (found is not None) == (p in covered)
+            assert found is None or found.contains(p)
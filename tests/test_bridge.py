@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from aoclib.graph.bridge import BridgeTree, find_bridges
+from aoclib.graph.graph import UndiGraph
+from aoclib.structures.dsu import DSU
+
+
+def num_components(n: int, edges: list[tuple[int, int]], removed: int = -1) -> int:
+    """Connected components among the nodes other than ``removed``."""
+    dsu = DSU(n)
+    for u, v in edges:
+        if removed not in (u, v):
+            dsu.merge(u, v)
+    return dsu.num_components - (removed != -1)
+
+
+def random_graph(rng: random.Random) -> tuple[int, list[tuple[int, int]]]:
+    # Sparse enough for bridges; parallel edges and self loops are common
+    n = rng.randint(1, 9)
+    edges = [(rng.randrange(n), rng.randrange(n)) for _ in range(rng.randint(0, 2 * n))]
+    return n, edges
+
+
+def build(n: int, edges: list[tuple[int, int]]) -> UndiGraph:
+    g = UndiGraph(n)
+    for u, v in edges:
+        g.add_edge(u, v)
+    return g
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bridge_tree(seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(50):
+        n, edges = random_graph(rng)
+        bt = BridgeTree(build(n, edges))
+        c = num_components(n, edges)
+
+        # An edge is a bridge iff removing just that copy of it splits a
+        # component; a parallel copy or a self loop never is one.
+        expected = sorted(
+            tuple(sorted(e))
+            for k, e in enumerate(edges)
+            if num_components(n, edges[:k] + edges[k + 1 :]) > c
+        )
+        assert sorted(tuple(sorted(e)) for e in bt.bridges) == expected
+        assert sorted(tuple(sorted(e)) for e in find_bridges(build(n, edges))) == (
+            expected
+        )
+
+        # 2-edge-connected components are the components without the bridges
+        bridge_set = set(expected)
+        kept = [e for e in edges if tuple(sorted(e)) not in bridge_set]
+        dsu = DSU(n)
+        for u, v in kept:
+            dsu.merge(u, v)
+        for u in range(n):
+            for v in range(n):
+                assert (bt.comp[u] == bt.comp[v]) == dsu.same(u, v)
+        assert bt.num_comps == dsu.num_components
+        assert sorted(bt.sizes) == sorted(dsu.components())
+        for u in range(n):
+            assert bt.sizes[bt.comp[u]] == dsu.size(u)
+
+        # A node is an articulation point iff removing it leaves more
+        # components than it belonged to
+        adj = build(n, edges).adj
+        isolated = [all(u == v for v in adj[u]) for u in range(n)]
+        expected_cut = [
+            u for u in range(n) if num_components(n, edges, u) > c - isolated[u]
+        ]
+        assert bt.articulation_points == expected_cut
+
+        # The bridge tree is a forest with one tree per component
+        t = bt.tree()
+        assert t.n == bt.num_comps
+        assert num_components(t.n, [(u, v) for u in range(t.n) for v in t.adj[u]]) == c
+        assert sum(map(len, t.adj)) == 2 * len(expected)
+        assert t.n - len(expected) == c
+
+
+def test_parallel_edges_are_not_bridges() -> None:
+    bt = BridgeTree(build(4, [(0, 1), (1, 0), (1, 2), (2, 3), (3, 3)]))
+    assert sorted(tuple(sorted(e)) for e in bt.bridges) == [(1, 2), (2, 3)]
+    assert sorted(bt.sizes) == [1, 1, 2]
+    assert bt.articulation_points == [1, 2]
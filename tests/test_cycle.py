@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import pytest
+
+from aoclib.cycle import brent, fast_forward
+
+
+def rho(mu: int, lam: int) -> Callable[[int], int]:
+    """A step over ints: a tail 0..mu-1 into the cycle mu..mu+lam-1."""
+
+    def step(x: int) -> int:
+        return x + 1 if x + 1 < mu + lam else mu
+
+    return step
+
+
+def nth(mu: int, lam: int, n: int) -> int:
+    return n if n < mu else mu + (n - mu) % lam
+
+
+SHAPES = [(0, 1), (0, 5), (1, 1), (3, 1), (4, 7), (10, 3), (17, 16)]
+
+
+@pytest.mark.parametrize(("mu", "lam"), SHAPES)
+def test_brent(mu: int, lam: int) -> None:
+    assert brent(0, rho(mu, lam)) == (mu, lam)
+
+
+@pytest.mark.parametrize(("mu", "lam"), SHAPES)
+@pytest.mark.parametrize("use_brent", [False, True])
+def test_fast_forward(mu: int, lam: int, use_brent: bool) -> None:
+    step = rho(mu, lam)
+    for n in [0, 1, mu - 1, mu, mu + 1, mu + lam - 1, mu + lam, 3 * (mu + lam) + 2]:
+        if n >= 0:
+            assert fast_forward(0, step, n, use_brent=use_brent) == nth(mu, lam, n)
+    assert fast_forward(0, step, 10**12, use_brent=use_brent) == nth(
+        mu, lam, 10**12
+    )
+
+
+@pytest.mark.parametrize("use_brent", [False, True])
+def test_fast_forward_key(use_brent: bool) -> None:
+    # States carry a step counter that never repeats; only the key cycles
+    def step(s: tuple[int, int]) -> tuple[int, int]:
+        x, t = s
+        return rho(4, 7)(x), t + 1
+
+    x, _ = fast_forward((0, 0), step, 10**9, key=lambda s: s[0], use_brent=use_brent)
+    assert x == nth(4, 7, 10**9)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from aoclib.structures.dsu import DSU
+
+
+def partition(dsu: DSU) -> list[int]:
+    """The smallest node of every node's component, a canonical labelling."""
+    smallest: dict[int, int] = {}
+    for u in range(dsu.n):
+        smallest.setdefault(dsu.find(u), u)
+    return [smallest[dsu.find(u)] for u in range(dsu.n)]
+
+
+def record(dsu: DSU) -> tuple[list[int], int, list[int]]:
+    return partition(dsu), dsu.num_components, [dsu.size(u) for u in range(dsu.n)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rollback(seed: int) -> None:
+    rng = random.Random(seed)
+    n = rng.randint(1, 30)
+    dsu = DSU(n, rollback=True)
+    saved: list[tuple[int, tuple[list[int], int, list[int]]]] = []
+
+    for _ in range(200):
+        op = rng.random()
+        if op < 0.6:
+            dsu.merge(rng.randrange(n), rng.randrange(n))
+        elif op < 0.8 or not saved:
+            saved.append((dsu.snapshot(), record(dsu)))
+        else:
+            # Undo to a random earlier snapshot; later ones become invalid
+            k = rng.randrange(len(saved))
+            snap, state = saved[k]
+            del saved[k + 1 :]
+            dsu.rollback(snap)
+            assert record(dsu) == state
+
+        # Replaying the surviving merges in a fresh DSU gives the same state
+        fresh = DSU(n)
+        for v in dsu.history:
+            fresh.merge(v, dsu.leader[v])
+        assert partition(fresh) == partition(dsu)
+        assert fresh.num_components == dsu.num_components
+
+
+def test_rollback_restores_sizes() -> None:
+    dsu = DSU(4, rollback=True)
+    dsu.merge(0, 1)
+    snap = dsu.snapshot()
+    dsu.merge(2, 3)
+    dsu.merge(1, 3)
+    assert dsu.size(0) == 4
+    dsu.rollback(snap)
+    assert [dsu.size(u) for u in range(4)] == [2, 2, 1, 1]
+    assert dsu.num_components == 3
+    assert not dsu.same(0, 2)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from aoclib.int_range import IntervalSet, IntRange
+
+
+def to_set(s: IntervalSet) -> set[int]:
+    return {v for r in s for v in range(r.low, r.high + 1)}
+
+
+def random_ranges(rng: random.Random) -> list[IntRange]:
+    # Short ranges on a small line: empty, adjacent, touching and nested
+    # ranges all come up, and a high below the low gives an empty range
+    return [
+        IntRange(low, low + rng.randint(-1, 4))
+        for low in (rng.randint(0, 20) for _ in range(rng.randint(0, 5)))
+    ]
+
+
+def check_canonical(s: IntervalSet) -> None:
+    # Sorted, disjoint and non-adjacent, so equal sets compare equal
+    for a, b in zip(s.ranges, s.ranges[1:]):
+        assert a.low <= a.high and a.high + 1 < b.low
+    assert all(r.low <= r.high for r in s.ranges)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_interval_set(seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(100):
+        a = IntervalSet(random_ranges(rng))
+        b = IntervalSet(random_ranges(rng))
+        sa = to_set(a)
+        sb = to_set(b)
+        check_canonical(a)
+        assert a.len == len(sa)
+        assert bool(a) == bool(sa)
+        if sa:
+            assert a.low == min(sa) and a.high == max(sa)
+
+        for result, expected in [
+            (a | b, sa | sb),
+            (a & b, sa & sb),
+            (a - b, sa - sb),
+            (a.union(b), sa | sb),
+            (a.intersection(b), sa & sb),
+            (a.difference(b), sa - sb),
+            (a.complement(IntRange(3, 17)), set(range(3, 18)) - sa),
+            (a.shift(-5), {v - 5 for v in sa}),
+        ]:
+            check_canonical(result)
+            assert to_set(result) == expected
+
+        assert (a | b) == IntervalSet([*a, *b])
+        for v in range(-2, 28):
+            assert a.contains(v) == (v in sa)
+            r = a.find(v)
+            assert (r is not None) == (v in sa)
+            assert r is None or (r in a.ranges and r.contains(v))
+
+
+def test_interval_set_adjacent_and_touching() -> None:
+    s = IntervalSet([IntRange(5, 7), IntRange(0, 2), IntRange(3, 4), IntRange(7, 9)])
+    assert s.ranges == [IntRange(0, 9)]
+    assert IntervalSet([IntRange(2, 1)]).ranges == []
+    assert (s - IntervalSet([IntRange(3, 3)])).ranges == [
+        IntRange(0, 2),
+        IntRange(4, 9),
+    ]
+    assert (s & IntervalSet([IntRange(9, 12)])).ranges == [IntRange(9, 9)]
+    assert not (IntervalSet() & s)
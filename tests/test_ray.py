@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from aoclib.geometry.point import Point
+from aoclib.geometry.ray import count_crossings_in_box, rays_cross_in_box
+
+
+def brute_force(ps: list[Point], vs: list[Point], lo: int, hi: int) -> int:
+    n = len(ps)
+    return sum(
+        rays_cross_in_box(ps[i], vs[i], ps[j], vs[j], lo, hi)
+        for i in range(n)
+        for j in range(i + 1, n)
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_count_crossings_in_box(seed: int) -> None:
+    # Small coordinates make shared points, parallel and collinear rays common
+    rng = random.Random(seed)
+    for _ in range(100):
+        n = rng.randint(0, 14)
+        r = rng.choice([3, 8])
+        ps = [Point(rng.randint(-r, r), rng.randint(-r, r)) for _ in range(n)]
+        vs = [Point(rng.randint(-2, 2), rng.randint(-2, 2)) for _ in range(n)]
+        lo = rng.randint(-4, 1)
+        hi = lo + rng.randint(0, 5)
+        assert count_crossings_in_box(ps, vs, lo, hi) == brute_force(ps, vs, lo, hi)
+
+
+def test_count_crossings_in_box_no_crossings() -> None:
+    # Parallel rays spanning the box, and above them rays fanning out with
+    # growing slopes: a quadratic scan over overlapping extents would take
+    # several times longer than the sweep here.
+    n = 3000
+    ps = [Point(0, i) for i in range(n)]
+    vs = [Point(1, 0) for _ in range(n)]
+    ps += [Point(0, n + i) for i in range(n)]
+    vs += [Point(1, i) for i in range(n)]
+    assert count_crossings_in_box(ps, vs, 0, 4 * n) == 0
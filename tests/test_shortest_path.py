@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import pytest
+
+from aoclib.graph.shortest_path import shortest_path
+
+
+def test_dial_rejects_heavier_edges() -> None:
+    adj = {0: [(1, 3)], 1: [(2, 1)], 2: []}
+    dist, _ = shortest_path(3, [0], adj.__getitem__)
+    assert list(dist) == [0, 3, 4]
+    with pytest.raises(AssertionError):
+        shortest_path(3, [0], adj.__getitem__, max_weight=1)
+    dist, _ = shortest_path(3, [0], adj.__getitem__, max_weight=3)
+    assert list(dist) == [0, 3, 4]
@@ -2,22 +2,18 @@ from __future__ import annotations
 
 import argparse
 import os
-from collections.abc import Callable
+from bisect import bisect_right
+from collections.abc import Callable, Iterator
 from typing import NamedTuple
 
 import pytest
+from hypothesis import given
+from hypothesis import strategies as st
 
-from aoclib.int_range import IntRange
+from aoclib.int_range import IntervalSet, IntRange
 from aoclib.util import read_file
 
 
-def get_gap_range(this: IntRange, that: IntRange) -> IntRange | None:
-    new_len = that.low - this.high - 1
-    if new_len <= 0:
-        return None
-    return IntRange.from_len(this.high + 1, new_len)
-
-
 class MapOp(NamedTuple):
     dest_start: int
     src_range: IntRange
@@ -75,107 +71,129 @@ def map_result(val: int, layers: list[list[MapOp]]) -> int:
     return val
 
 
-def apply_layer_to_range(val_range: IntRange, layer: list[MapOp]) -> list[IntRange]:
-    res = []
-
-    first = None
-    last = None
-
-    for i in range(len(layer)):
-        op = layer[i]
-        if val_range.join(layer[i].src_range) is not None:
-            first = i
-            break
-
-    for i in range(len(layer) - 1, -1, -1):
-        op = layer[i]
-        if val_range.join(layer[i].src_range) is not None:
-            last = i
-            break
-
-    if first is None and last is None:
-        return [val_range]
-
-    assert first is not None and last is not None
-
-    overlap_ranges: list[IntRange] = []
-
-    for i in range(first, last + 1):
-        op = layer[i]
-        overlap_range = val_range.join(op.src_range)
-        if overlap_range is None:
-            continue
-        overlap_ranges.append(overlap_range)
-        res_range = op.map_range(overlap_range)
-        res.append(res_range)
-
-    for j in range(len(overlap_ranges) - 1):
-        gap = get_gap_range(overlap_ranges[j], overlap_ranges[j + 1])
-        if gap is None:
-            continue
-        res.append(gap)
-
-    if val_range.low < overlap_ranges[0].low:
-        res.append(
-            IntRange.from_len(
-                low=val_range.low, len=overlap_ranges[0].low - val_range.low
-            )
-        )
-    if overlap_ranges[-1].high < val_range.high:
-        res.append(
-            IntRange.from_len(
-                low=overlap_ranges[-1].high + 1,
-                len=val_range.high - overlap_ranges[-1].high,
-            )
-        )
-
-    return res
+class PiecewiseShift:
+    """
+    A map on all ints that adds ``offsets[i]`` to the values in
+    ``[starts[i], starts[i + 1])``, with ``starts[0]`` below any value.
+    """
+
+    MIN = -(1 << 62)
+
+    def __init__(self, starts: list[int], offsets: list[int]) -> None:
+        assert starts[0] == self.MIN and len(starts) == len(offsets)
+        self.starts = starts
+        self.offsets = offsets
+
+    @classmethod
+    def from_layer(cls, layer: list[MapOp]) -> PiecewiseShift:
+        # Identity pieces fill the gaps between (and around) the ops
+        starts = [cls.MIN]
+        offsets = [0]
+        for op in layer:
+            if op.src_range.low != starts[-1]:
+                starts.append(op.src_range.low)
+                offsets.append(op.dest_start - op.src_range.low)
+            else:
+                offsets[-1] = op.dest_start - op.src_range.low
+            starts.append(op.src_range.high + 1)
+            offsets.append(0)
+        return cls(starts, offsets)._merged()
+
+    def _merged(self) -> PiecewiseShift:
+        starts = [self.starts[0]]
+        offsets = [self.offsets[0]]
+        for start, offset in zip(self.starts[1:], self.offsets[1:]):
+            if offset != offsets[-1]:
+                starts.append(start)
+                offsets.append(offset)
+        return PiecewiseShift(starts, offsets)
+
+    def pieces(self) -> Iterator[tuple[IntRange, int]]:
+        ends = [*self.starts[1:], -self.MIN]
+        for start, end, offset in zip(self.starts, ends, self.offsets):
+            yield IntRange(start, end - 1), offset
+
+    def __call__(self, val: int) -> int:
+        return val + self.offsets[bisect_right(self.starts, val) - 1]
+
+    def then(self, g: PiecewiseShift) -> PiecewiseShift:
+        """The composition ``g(self(x))``."""
+        starts = []
+        offsets = []
+        for piece, offset in self.pieces():
+            # Split the image of this piece at the breakpoints of g
+            low = piece.low + offset
+            i = bisect_right(g.starts, low) - 1
+            while True:
+                starts.append(low - offset)
+                offsets.append(offset + g.offsets[i])
+                i += 1
+                if i == len(g.starts) or g.starts[i] > piece.high + offset:
+                    break
+                low = g.starts[i]
+        return PiecewiseShift(starts, offsets)._merged()
+
+    def map_set(self, vals: IntervalSet) -> IntervalSet:
+        res = []
+        pieces = list(self.pieces())
+        i = 0
+        for r in vals:
+            while pieces[i][0].high < r.low:
+                i += 1
+            j = i
+            while j < len(pieces) and pieces[j][0].low <= r.high:
+                piece, offset = pieces[j]
+                overlap = piece.join(r)
+                assert overlap is not None
+                res.append(IntRange(overlap.low + offset, overlap.high + offset))
+                j += 1
+        return IntervalSet(res)
+
+
+def compose_layers(layers: list[list[MapOp]]) -> PiecewiseShift:
+    f = PiecewiseShift([PiecewiseShift.MIN], [0])
+    for layer in layers:
+        f = f.then(PiecewiseShift.from_layer(layer))
+    return f
 
 
-def map_range(val_range: IntRange, layers: list[list[MapOp]]) -> list[IntRange]:
-    vranges = [val_range]
-    for layer in layers:
-        new_vranges = []
-        for vrange in vranges:
-            new_vranges.extend(apply_layer_to_range(vrange, layer))
-        vranges = new_vranges
-    vranges.sort(key=lambda int_range: int_range.low)
-    return vranges
+def apply_layer_to_set(vals: IntervalSet, layer: list[MapOp]) -> IntervalSet:
+    return PiecewiseShift.from_layer(layer).map_set(vals)
 
 
 def part1(input: str) -> int:
     parts = input.split("\n\n")
     seeds = parse_seeds(parts[0])
-    layers = parse_map_layers(parts)
-    ans = int(1e9)
-    for seed in seeds:
-        result = map_result(seed, layers)
-        ans = min(ans, result)
-
-    return ans
+    f = compose_layers(parse_map_layers(parts))
+    return min(map(f, seeds))
 
 
 def part2(input: str) -> int:
+    parts = input.split("\n\n")
+    seed_ranges = parse_seed_ranges(parts[0])
+    f = compose_layers(parse_map_layers(parts))
+    return f.map_set(IntervalSet(seed_ranges)).low
+
+
+def part2_by_layer(input: str) -> int:
     parts = input.split("\n\n")
     seed_ranges = parse_seed_ranges(parts[0])
     layers = parse_map_layers(parts)
-    result_ranges = []
-    for seed_range in seed_ranges:
-        result_ranges.extend(map_range(seed_range, layers))
-    result_ranges.sort(key=lambda int_range: int_range.low)
-    return result_ranges[0].low
+    vals = IntervalSet(seed_ranges)
+    for layer in layers:
+        vals = apply_layer_to_set(vals, layer)
+    return vals.low
 
 
 def part2_stupid(input: str) -> int:
     parts = input.split("\n\n")
     seed_ranges = parse_seed_ranges(parts[0])
-    layers = parse_map_layers(parts)
-    ans = int(1e9)
+    f = compose_layers(parse_map_layers(parts))
+    ans = int(1e18)
 
     for seed_range in seed_ranges:
         for seed in range(seed_range.low, seed_range.high + 1):
-            result = map_result(seed, layers)
-            ans = min(ans, result)
+            ans = min(ans, f(seed))
 
     return ans
 
@@ -209,6 +227,9 @@ def main():
         (part1, "input.txt", 389056265),
         (part2, "sample.txt", 46),
         (part2, "input.txt", 137516820),
+        (part2_by_layer, "sample.txt", 46),
+        (part2_by_layer, "input.txt", 137516820),
+        (part2_stupid, "sample.txt", 46),
     ],
 )
 def test(solver: Callable[[str], int], file: str, ans: int) -> None:
@@ -216,5 +237,26 @@ def test(solver: Callable[[str], int], file: str, ans: int) -> None:
     assert solver(read_file(filepath)) == ans
 
 
+@given(st.integers(min_value=0, max_value=1 << 32))
+def test_compose_layers(seed: int) -> None:
+    filepath = os.path.join(os.path.dirname(__file__), "input.txt")
+    layers = parse_map_layers(read_file(filepath).split("\n\n"))
+    assert compose_layers(layers)(seed) == map_result(seed, layers)
+
+
+@given(
+    st.lists(st.tuples(st.integers(0, 120), st.integers(0, 20)), min_size=1, max_size=6)
+)
+def test_apply_layer_to_set(ranges: list[tuple[int, int]]) -> None:
+    filepath = os.path.join(os.path.dirname(__file__), "sample.txt")
+    layers = parse_map_layers(read_file(filepath).split("\n\n"))
+    vals = IntervalSet(IntRange.from_len(low, len + 1) for low, len in ranges)
+    seeds = {seed for r in vals for seed in range(r.low, r.high + 1)}
+    for layer in layers:
+        vals = apply_layer_to_set(vals, layer)
+        seeds = {map_result(seed, [layer]) for seed in seeds}
+        assert {v for r in vals for v in range(r.low, r.high + 1)} == seeds
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
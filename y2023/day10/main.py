@@ -3,12 +3,12 @@ from __future__ import annotations
 import argparse
 import os
 import pprint
-from collections import defaultdict, deque
+from collections import defaultdict
 from collections.abc import Callable
 
 import pytest
 
-from aoclib.grid2d import Di4, Pos, State
+from aoclib.grid2d import UNREACHED, Di4, Grid, Pos, State, grid_bfs
 from aoclib.util import read_file
 
 
@@ -61,7 +61,7 @@ def part1(input: str) -> int:
 
 def part2(input: str) -> int:
     g = [[c for c in line] for line in input.splitlines()]
-    g2 = [["." for c in range(len(g[0]) * 3)] for r in range(len(g) * 3)]
+    g2 = Grid(len(g) * 3, len(g[0]) * 3, ".")
 
     shape_map = defaultdict(list)
     shape_map["|"] = [(0, 1), (1, 1), (2, 1)]
@@ -79,40 +79,24 @@ def part2(input: str) -> int:
     for r in range(len(g)):
         for c in range(len(g[0])):
             for rr, cc in shape_map[g[r][c]]:
-                g2[3 * r + rr][3 * c + cc] = "x"
+                g2[3 * r + rr, 3 * c + cc] = "x"
 
-    visited = [[False for c in range(len(g2[0]))] for r in range(len(g2))]
+    border = [
+        *[(r, c) for r in range(g2.h) for c in [0, g2.w - 1]],
+        *[(r, c) for r in [0, g2.h - 1] for c in range(g2.w)],
+    ]
+    visited = grid_bfs(g2, border, passable=".")
     start = find_start(g)
-    visited[start.r * 3][start.c * 3] = True
-    q: deque[Pos] = deque()
-
-    for r in range(len(g2)):
-        q.append(Pos(r, 0))
-        q.append(Pos(r, len(g2[0]) - 1))
-        visited[r][0] = True
-        visited[r][len(g2[0]) - 1] = True
-    for c in range(len(g2[0])):
-        q.append(Pos(0, c))
-        q.append(Pos(len(g2) - 1, c))
-        visited[0][c] = True
-        visited[len(g2) - 1][c] = True
-
-    while len(q) > 0:
-        u = q.popleft()
-
-        for d in Di4:
-            v = u.go(d)
-            if v.inside(g2) and g2[v.r][v.c] == "." and not visited[v.r][v.c]:
-                q.append(v)
-                visited[v.r][v.c] = True
 
     ans = 0
     for r in range(len(g)):
         for c in range(len(g[0])):
+            if Pos(r, c) == start:  # part of the loop
+                continue
             passed = False
             for rr in range(3):
                 for cc in range(3):
-                    if visited[r * 3 + rr][c * 3 + cc]:
+                    if visited[g2.index(r * 3 + rr, c * 3 + cc)] != UNREACHED:
                         passed = True
             if not passed:
                 g[r][c] = "Y"
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import argparse
 import os
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
 import pytest
 
+from aoclib.cycle import fast_forward
 from aoclib.grid2d import format_grid
 from aoclib.util import read_file
 
@@ -93,21 +94,52 @@ def rotate(g: list[list[str]]) -> None:
     tilt_east(g)
 
 
+def roll_targets(g: list[list[str]], di: int, dj: int) -> list[int]:
+    """
+    For every flat index ``i * m + j``, the farthest cell a rock there rolls
+    to when tilted towards ``(di, dj)``, ignoring the other rocks.
+    """
+    n = len(g)
+    m = len(g[0])
+    target = [0] * (n * m)
+    # Visit the cells nearest to the edge being tilted towards first
+    for i in range(n)[:: -1 if di > 0 else 1]:
+        for j in range(m)[:: -1 if dj > 0 else 1]:
+            pi, pj = i + di, j + dj
+            if 0 <= pi < n and 0 <= pj < m and g[pi][pj] != "#":
+                target[i * m + j] = target[pi * m + pj]
+            else:
+                target[i * m + j] = i * m + j
+    return target
+
+
+def tilt_rocks(rocks: Iterable[int], target: list[int], step: int) -> list[int]:
+    # Rocks that roll to the same cell stack up behind it, one step back each
+    count: dict[int, int] = {}
+    for p in rocks:
+        t = target[p]
+        count[t] = count.get(t, 0) + 1
+    return [t - k * step for t, c in count.items() for k in range(c)]
+
+
 def part2(input: str) -> int:
     N = 1000000000
     g = parse(input)
-    cache: dict[str, int] = {}  # key: txt(g); val: index when g first encountered
-    for i in range(N):
-        rotate(g)
-        s = txt(g)
-        if s in cache:
-            cycle = i - cache[s]
-            k = (N - 1 - i) % cycle
-            for _ in range(k):
-                rotate(g)
-            return calc(g)
-        cache[s] = i
-    return 0
+    n = len(g)
+    m = len(g[0])
+    dirs = [(-1, 0), (0, -1), (1, 0), (0, 1)]  # north, west, south, east
+    tilts = [(roll_targets(g, di, dj), di * m + dj) for di, dj in dirs]
+
+    def spin(rocks: tuple[int, ...]) -> tuple[int, ...]:
+        cur: Iterable[int] = rocks
+        for target, step in tilts:
+            cur = tilt_rocks(cur, target, step)
+        return tuple(sorted(cur))
+
+    # The sorted rock positions are the whole state, so they are their own key
+    rocks = tuple(i * m + j for i in range(n) for j in range(m) if g[i][j] == "O")
+    rocks = fast_forward(rocks, spin, N)
+    return sum(n - p // m for p in rocks)
 
 
 def main():
@@ -130,6 +162,7 @@ def main():
         (part1, "sample.txt", 104),
         (part1, "input.txt", 101106),
         (part2, "sample.txt", 64),
+        (part2, "input.txt", 89089),
     ],
 )
 def test(solver: Callable[[str], int], file: str, ans: int) -> None:
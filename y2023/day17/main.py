@@ -1,91 +1,114 @@
 from __future__ import annotations
 
 import argparse
-import heapq
 import os
-from collections import defaultdict
-from collections.abc import Callable
-from typing import NamedTuple
+from collections.abc import Callable, Iterator
+from functools import partial
 
 import pytest
 
-from aoclib.grid2d import Di4, Pos, parse_grid, turn_left, turn_right
+from aoclib.graph.shortest_path import shortest_path
+from aoclib.grid2d import TURN_LEFT, TURN_RIGHT, Di4, StateSpace
 from aoclib.util import read_file
 
-INF = int(1e9)
-
-
-class State(NamedTuple):
-    pos: Pos
-    dir: Di4
-    same_dir: int
+# Axis of the last move in a segment-jump state
+HORIZONTAL = 0
+VERTICAL = 1
+
+
+def solve_by_step(input: str, min_same_dir: int, max_same_dir: int) -> int:
+    lines = input.splitlines()
+    n = len(lines)
+    m = len(lines[0])
+    heat = [int(ch) for line in lines for ch in line]  # by cell id
+
+    # State ids encode (r, c, dir, same_dir)
+    space = StateSpace(n, m, extra_size=max_same_dir + 1)
+    k = space.extra_size
+    neighbor = space.neighbor
+    t = space.cell(n - 1, m - 1)
+
+    def successors(u: int) -> Iterator[tuple[int, int]]:
+        base, same_dir = divmod(u, k)
+        cell, dir = divmod(base, 4)
+        for v_dir in (dir, TURN_LEFT[dir], TURN_RIGHT[dir]):
+            if v_dir == dir:
+                if same_dir == max_same_dir:
+                    continue
+                v_same_dir = same_dir + 1
+            else:
+                if same_dir < min_same_dir:
+                    continue
+                v_same_dir = 1
+            v_cell = neighbor[cell * 4 + v_dir]
+            if v_cell == StateSpace.OUT:
+                continue
+            yield (v_cell * 4 + v_dir) * k + v_same_dir, heat[v_cell]
 
+    def is_target(u: int) -> bool:
+        base, same_dir = divmod(u, k)
+        return base // 4 == t and same_dir >= min_same_dir
 
-class Entry(NamedTuple):
-    state: State
-    cost: int
+    start_states = [space.encode(0, 0, d) for d in [Di4.R, Di4.D]]
+    cost, t_state = shortest_path(
+        space.size, start_states, successors, is_target, max_weight=9
+    )
 
-    def __lt__(self, other: object) -> bool:
-        if isinstance(other, Entry):
-            return self.cost < other.cost
-        raise TypeError()
+    assert t_state != -1
+    return cost[t_state]
 
 
 def solve(input: str, min_same_dir: int, max_same_dir: int) -> int:
-    g = parse_grid(input)
-    n = len(g)
-    m = len(g[0])
-
-    s = Pos(0, 0)
-    t = Pos(n - 1, m - 1)
-
-    cost: dict[State, int] = defaultdict(lambda: INF)
-    start_states = [State(pos=s, dir=d, same_dir=0) for d in [Di4.R, Di4.D]]
-    q: list[Entry] = []
-    for ss in start_states:
-        cost[ss] = 0
-        entry = Entry(state=ss, cost=0)
-        heapq.heappush(q, entry)
-
-    t_state = None
-
-    while len(q) > 0:
-        u = heapq.heappop(q)
-        u_pos, u_dir, u_same_dir = u.state
-
-        if t == u_pos and u_same_dir >= min_same_dir:
-            t_state = u.state
-            break
-
-        if cost[u.state] < u.cost:
-            continue
-
-        dirs = [u_dir]
-        if u.state.same_dir >= min_same_dir:
-            dirs.append(turn_left(u_dir))
-            dirs.append(turn_right(u_dir))
-
-        for dir in dirs:
-            if dir == u_dir:
-                if u.state.same_dir == max_same_dir:
-                    continue
-                v_same_dir = u_same_dir + 1
-            else:
-                v_same_dir = 1
-            v_pos = u_pos.go(dir)
-            v_state = State(pos=v_pos, dir=dir, same_dir=v_same_dir)
-            if not v_pos.inside(g):
-                continue
-            w = int(g[v_pos.r][v_pos.c])
-            if cost[u.state] + w < cost[v_state]:
-                cost[v_state] = cost[u.state] + w
-                v = Entry(
-                    state=v_state,
-                    cost=cost[v_state],
-                )
-                heapq.heappush(q, v)
-
-    assert t_state is not None
+    # A move turns, then goes k cells in a straight line in one edge, so there
+    # is no same_dir counter in the state: only the cell and the axis of the
+    # last move, since the next move must be on the other axis.
+    lines = input.splitlines()
+    n = len(lines)
+    m = len(lines[0])
+
+    # row_heat[r * (m + 1) + c]: heat of cells (r, 0..c-1)
+    # col_heat[c * (n + 1) + r]: heat of cells (0..r-1, c)
+    row_heat = [0 for _ in range(n * (m + 1))]
+    col_heat = [0 for _ in range(m * (n + 1))]
+    for r, line in enumerate(lines):
+        for c, ch in enumerate(line):
+            row_heat[r * (m + 1) + c + 1] = row_heat[r * (m + 1) + c] + int(ch)
+            col_heat[c * (n + 1) + r + 1] = col_heat[c * (n + 1) + r] + int(ch)
+
+    min_k = max(min_same_dir, 1)
+
+    def successors(u: int) -> Iterator[tuple[int, int]]:
+        cell, axis = divmod(u, 2)
+        r, c = divmod(cell, m)
+        if axis == VERTICAL:  # go left or right
+            base = r * (m + 1)
+            for k in range(min_k, min(max_same_dir, m - 1 - c) + 1):
+                w = row_heat[base + c + k + 1] - row_heat[base + c + 1]
+                yield (cell + k) * 2 + HORIZONTAL, w
+            for k in range(min_k, min(max_same_dir, c) + 1):
+                w = row_heat[base + c] - row_heat[base + c - k]
+                yield (cell - k) * 2 + HORIZONTAL, w
+        else:  # go up or down
+            base = c * (n + 1)
+            for k in range(min_k, min(max_same_dir, n - 1 - r) + 1):
+                w = col_heat[base + r + k + 1] - col_heat[base + r + 1]
+                yield (cell + k * m) * 2 + VERTICAL, w
+            for k in range(min_k, min(max_same_dir, r) + 1):
+                w = col_heat[base + r] - col_heat[base + r - k]
+                yield (cell - k * m) * 2 + VERTICAL, w
+
+    t = n * m - 1
+    cost, t_state = shortest_path(
+        n * m * 2,
+        [HORIZONTAL, VERTICAL],  # both axes at cell 0
+        successors,
+        is_target=lambda u: u // 2 == t,
+        max_weight=9 * max_same_dir,
+        # A segment weighs up to 90, still few enough buckets to beat the heap
+        use_buckets=True,
+    )
+
+    assert t_state != -1
     return cost[t_state]
 
 
@@ -121,6 +144,11 @@ def main():
         (part1, "sample.txt", 102),
         (part2, "sample.txt", 94),
         (part2, "sample2.txt", 71),
+        (partial(solve_by_step, min_same_dir=0, max_same_dir=3), "sample.txt", 102),
+        (partial(solve_by_step, min_same_dir=4, max_same_dir=10), "sample.txt", 94),
+        (partial(solve_by_step, min_same_dir=4, max_same_dir=10), "sample2.txt", 71),
+        (part1, "input.txt", 1244),
+        (part2, "input.txt", 1367),
     ],
 )
 def test(solver: Callable[[str], int], file: str, ans: int) -> None:
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import argparse
 import os
-from collections import deque
 from collections.abc import Callable, Sequence
 from functools import partial
 from typing import NamedTuple
@@ -10,7 +9,7 @@ from typing import NamedTuple
 import pytest
 
 from aoclib.geometry.point import Point
-from aoclib.grid2d import Di4, Pos
+from aoclib.grid2d import UNREACHED, Di4, Grid, Pos, grid_bfs
 from aoclib.util import read_file
 
 
@@ -85,65 +84,18 @@ def part1_solve(steps: Sequence[Step]) -> int:
     origin = Pos(abs(min_r) + 1, abs(min_c) + 1)
     cur = Pos(origin.r, origin.c)
 
-    g = [["." for c in range(m)] for r in range(n)]
-    g[cur.r][cur.c] = "#"
+    g = Grid(n, m, ".")
+    g[cur] = "#"
     for step in steps:
         d = step.di
         for _ in range(step.len):
             cur = cur.go(d)
-            g[cur.r][cur.c] = "#"
-
-    # Get origin
-    maybe_starts = []
-    start_step_dirs: list[tuple[int, int]] = [
-        (-1, -1),
-        (-1, 0),
-        (-1, 1),
-        (0, -1),
-        (0, 1),
-        (1, -1),
-        (1, 0),
-        (1, 1),
-    ]
-    for step_dir in start_step_dirs:
-        ss = Pos(origin.r + step_dir[0], origin.c + step_dir[1])
-        if g[ss.r][ss.c] == ".":
-            maybe_starts.append(ss)
-
-    # Flood-fill
-    for ch in ["x", "o"]:
-        s = next(ss for ss in maybe_starts if g[ss.r][ss.c] == ".")
-        q: deque[Pos] = deque([s])
-        g[s.r][s.c] = ch
-
-        while len(q) > 0:
-            u = q.popleft()
-            for d in Di4:
-                v = u.go(d)
-                if v.inside(g) and g[v.r][v.c] == ".":
-                    g[v.r][v.c] = ch
-                    q.append(v)
-
-    if g[0][0] == "x":
-        ch_in, ch_out = "o", "x"
-    else:
-        ch_in, ch_out = "x", "o"
-
-    for r in range(n):
-        for c in range(m):
-            if g[r][c] == ch_in:
-                g[r][c] = "#"
-            elif g[r][c] == ch_out:
-                g[r][c] = "."
-
-    ans = 0
+            g[cur] = "#"
 
-    for r in range(n):
-        for c in range(m):
-            if g[r][c] == "#":
-                ans += 1
-
-    return ans
+    # The trench is padded by an empty border, so flooding from a corner
+    # reaches exactly the cells outside of the lagoon.
+    outside = grid_bfs(g, [(0, 0)], passable=".")
+    return n * m - sum(d != UNREACHED for d in outside)
 
 
 def part1(input: str) -> int:
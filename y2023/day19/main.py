@@ -1,19 +1,23 @@
 from __future__ import annotations
 
 import argparse
-import operator
 import os
-import typing
+import random
+from array import array
 from collections import deque
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 from typing import NamedTuple
 
 import pytest
 
-from aoclib.int_range import IntRange
+from aoclib.box import Box, BoxIndex
 from aoclib.util import read_file
 
-Part = dict[str, int]
+# Ratings of a part in the order of ATTS
+Part = tuple[int, ...]
+
+# Attribute order of part tuples and box axes
+ATTS = "xmas"
 
 
 class Cond(NamedTuple):
@@ -29,16 +33,12 @@ class Rule(NamedTuple):
     cond: Cond | None
     dest: str
 
-    @property
-    def eval(self) -> Callable[[Part], bool]:
+    def matches(self, part: Part) -> bool:
         if self.cond is None:
-            return lambda _: True
-        att, op_s, rhs = self.cond
-        op = {
-            "<": operator.lt,
-            ">": operator.gt,
-        }[op_s]
-        return lambda part: op(part[att], int(rhs))
+            return True
+        att, op, rhs = self.cond
+        val = part[ATTS.index(att)]
+        return val < rhs if op == "<" else val > rhs
 
 
 class Workflow(NamedTuple):
@@ -46,11 +46,8 @@ class Workflow(NamedTuple):
     rules: list[Rule]
 
 
-RangesState = dict[str, IntRange]
-
-
 class State(NamedTuple):
-    ranges_state: RangesState
+    box: Box
     workflow: str
     rule_id: int
 
@@ -82,21 +79,88 @@ def parse_workflow_input(workflow_input: str) -> Workflow:
 
 def parse_part(part_input: str) -> Part:
     s = part_input[1:-1]
-    att_strs = s.split(",")
-    res = {}
-    for att_str in att_strs:
-        att, _, rhs = att_str.partition("=")
-        res[att] = int(rhs)
-    return typing.cast(Part, res)
+    ratings = dict(att_str.split("=") for att_str in s.split(","))
+    return tuple(int(ratings[att]) for att in ATTS)
+
+
+ACCEPT = -1
+REJECT = -2
+
+# Bound of an always true test; ratings stay far below it
+UNCONDITIONAL = 1 << 62
+
+
+class Program:
+    """
+    Workflows compiled into one flat instruction array.
+
+    Instruction ``pc`` tests ``sign[pc] * part[axis[pc]] < bound[pc]``, which
+    is ``part[axis] < rhs`` for sign 1 and ``part[axis] > rhs`` for sign -1.
+    If the test holds, execution continues at ``jump[pc]``: the first
+    instruction of the destination workflow, or ``ACCEPT``/``REJECT``;
+    otherwise at ``pc + 1``. Rules without a condition always jump.
+    """
+
+    def __init__(self, workflows: list[Workflow], entry: str = "in") -> None:
+        starts = {"A": ACCEPT, "R": REJECT}
+        pc = 0
+        for w in workflows:
+            starts[w.name] = pc
+            pc += len(w.rules)
+        self.axis = array("b")
+        self.sign = array("b")
+        self.bound = array("q")
+        self.jump = array("i")
+        for w in workflows:
+            assert len(self.jump) == starts[w.name]
+            for rule in w.rules:
+                if rule.cond is None:
+                    self.axis.append(0)
+                    self.sign.append(1)
+                    self.bound.append(UNCONDITIONAL)
+                else:
+                    att, op, rhs = rule.cond
+                    sign = 1 if op == "<" else -1
+                    self.axis.append(ATTS.index(att))
+                    self.sign.append(sign)
+                    self.bound.append(sign * rhs)
+                self.jump.append(starts[rule.dest])
+        self.entry = starts[entry]
+
+    def accepts(self, part: Part) -> bool:
+        axis = self.axis
+        sign = self.sign
+        bound = self.bound
+        jump = self.jump
+        pc = self.entry
+        while pc >= 0:
+            if sign[pc] * part[axis[pc]] < bound[pc]:
+                pc = jump[pc]
+            else:
+                pc += 1
+        return pc == ACCEPT
 
+    def accepted(self, parts: Iterable[Part]) -> Iterator[Part]:
+        return filter(self.accepts, parts)
 
-def part1(input: str) -> int:
+
+def parse_input(input: str) -> tuple[list[Workflow], list[Part]]:
     workflows_input, parts_input = input.split("\n\n")
-    workflows: list[Workflow] = list(
-        map(parse_workflow_input, workflows_input.splitlines())
-    )
-    ws = {w.name: w for w in workflows}
+    workflows = list(map(parse_workflow_input, workflows_input.splitlines()))
     parts = list(map(parse_part, parts_input.splitlines()))
+    return workflows, parts
+
+
+def part1(input: str) -> int:
+    workflows, parts = parse_input(input)
+    program = Program(workflows)
+    return sum(map(sum, program.accepted(parts)))
+
+
+def part1_by_rules(input: str) -> int:
+    """Interprets the workflows rule by rule, without compiling them."""
+    workflows, parts = parse_input(input)
+    ws = {w.name: w for w in workflows}
 
     ans = 0
 
@@ -105,58 +169,39 @@ def part1(input: str) -> int:
         while cur not in ["R", "A"]:
             w = ws[cur]
             for rule in w.rules:
-                if rule.eval(part):
+                if rule.matches(part):
                     cur = rule.dest
                     break
         if cur == "A":
-            ans += sum(part.values())
+            ans += sum(part)
 
     return ans
 
 
-def eval_ranges(
-    r: IntRange,
-    cond: Cond,
-) -> tuple[IntRange, IntRange]:
+def split_box(box: Box, cond: Cond) -> tuple[Box | None, Box | None]:
+    """Splits ``box`` into the parts that take and leave the rule of ``cond``."""
+    axis = ATTS.index(cond.att)
     if cond.op == ">":
-        if r.low <= cond.rhs + 1 <= r.high:
-            take = IntRange(low=cond.rhs + 1, high=r.high)
-            leave = IntRange(low=r.low, high=cond.rhs)
-            return take, leave
-        elif cond.rhs + 1 > r.high:
-            take = IntRange.from_len(low=0, len=0)
-            leave = r
-            return take, leave
+        leave, take = box.split(axis, cond.rhs + 1)
     else:  # "<"
-        if r.low <= cond.rhs - 1 <= r.high:
-            take = IntRange(low=r.low, high=cond.rhs - 1)
-            leave = IntRange(low=cond.rhs, high=r.high)
-            return take, leave
-        elif cond.rhs - 1 < r.low:
-            take = IntRange.from_len(low=0, len=0)
-            leave = r
-            return take, leave
+        take, leave = box.split(axis, cond.rhs)
+    return take, leave
 
-    return r, IntRange.from_len(low=0, len=0)
 
-
-def part2(input: str) -> int:
-    workflows_input, _ = input.split("\n\n")
-    workflows: list[Workflow] = list(
-        map(parse_workflow_input, workflows_input.splitlines())
-    )
+def accepted_boxes(workflows: list[Workflow]) -> list[Box]:
+    """The disjoint boxes of ratings in 1..4000 accepted by the workflows."""
     ws = {w.name: w for w in workflows}
 
     s = State(
-        ranges_state={c: IntRange(low=1, high=4000) for c in "xmas"},
+        box=Box((1,) * len(ATTS), (4000,) * len(ATTS)),
         workflow="in",
         rule_id=0,
     )
     q: deque[State] = deque([s])
 
-    # Note that in the end, all ranges states are disjoint.
-    # Therefore, we do not need to care about overlapping results.
-    final_ranges_state: list[RangesState] = []
+    # Every split cuts a box into two disjoint halves, so the accepted boxes
+    # are disjoint and their volumes simply add up.
+    accepted: list[Box] = []
 
     while len(q) > 0:
         u = q.popleft()
@@ -164,67 +209,61 @@ def part2(input: str) -> int:
         if u.workflow == "R":
             continue
         if u.workflow == "A":
-            final_ranges_state.append(u.ranges_state)
+            accepted.append(u.box)
             continue
 
         workflow = ws[u.workflow]
         rule = workflow.rules[u.rule_id]
 
-        cond = rule.cond
-
-        if cond is None:
-            v = State(
-                ranges_state=dict(u.ranges_state),
-                workflow=rule.dest,
-                rule_id=0,
-            )
-            q.append(v)
-        else:
-            take_state = {}
-            leave_state = {}
-
-            for c in "xmas":
-                if cond.att == c:
-                    take, leave = eval_ranges(u.ranges_state[c], cond)
-                    take_state[c] = take
-                    leave_state[c] = leave
-                else:
-                    take_state[c] = u.ranges_state[c]
-                    leave_state[c] = u.ranges_state[c]
-
-            v_take = State(
-                ranges_state=take_state,
-                workflow=rule.dest,
-                rule_id=0,
-            )
-            v_leave = State(
-                ranges_state=leave_state,
-                workflow=workflow.name,
-                rule_id=u.rule_id + 1,
-            )
-
-            q.append(v_take)
-            q.append(v_leave)
+        if rule.cond is None:
+            q.append(State(box=u.box, workflow=rule.dest, rule_id=0))
+            continue
 
-    ans = 0
+        take, leave = split_box(u.box, rule.cond)
+        if take is not None:
+            q.append(State(box=take, workflow=rule.dest, rule_id=0))
+        if leave is not None:
+            q.append(State(box=leave, workflow=workflow.name, rule_id=u.rule_id + 1))
 
-    for ranges_state in final_ranges_state:
-        cur = 1
-        for c in "xmas":
-            if c not in ranges_state:
-                cur = 0
-                break
-            else:
-                cur *= ranges_state[c].len
-        ans += cur
+    return accepted
 
-    return ans
+
+def part2(input: str) -> int:
+    workflows_input, _ = input.split("\n\n")
+    workflows = list(map(parse_workflow_input, workflows_input.splitlines()))
+    return sum(box.volume for box in accepted_boxes(workflows))
+
+
+def part1_by_index(input: str) -> int:
+    """Classifies the parts by point location among the accepted boxes."""
+    workflows, parts = parse_input(input)
+    index = BoxIndex(accepted_boxes(workflows))
+    return sum(sum(part) for part in parts if index.contains(part))
+
+
+def check_consistency(input: str, n: int, seed: int = 0) -> int:
+    """
+    Classifies ``n`` random parts both by the compiled workflows and by the
+    accepted-region index, asserting they agree. Returns the number accepted.
+    """
+    workflows, _ = parse_input(input)
+    program = Program(workflows)
+    index = BoxIndex(accepted_boxes(workflows))
+    rng = random.Random(seed)
+    accepted = 0
+    for _ in range(n):
+        part = tuple(rng.randint(1, 4000) for _ in ATTS)
+        ok = program.accepts(part)
+        assert ok == index.contains(part), part
+        accepted += ok
+    return accepted
 
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("part", choices=["1", "2", "d"])
+    parser.add_argument("part", choices=["1", "2", "d", "c"])
     parser.add_argument("input_file")
+    parser.add_argument("-n", type=int, default=10**6, help="random parts for c")
 
     try:
         args = parser.parse_args()
@@ -235,6 +274,8 @@ def main():
 
     if args.part == "1":
         print(f"Part 1: {part1(input)}")
+    elif args.part == "c":
+        print(f"Consistent, accepted: {check_consistency(input, args.n)}/{args.n}")
     elif args.part == "d":
         print(f"{part2(input)}")
     else:
@@ -246,6 +287,10 @@ def main():
     [
         (part1, "sample.txt", 19114),
         (part1, "input.txt", 449531),
+        (part1_by_rules, "sample.txt", 19114),
+        (part1_by_rules, "input.txt", 449531),
+        (part1_by_index, "sample.txt", 19114),
+        (part1_by_index, "input.txt", 449531),
         (part2, "sample.txt", 167409079868000),
         (part2, "input.txt", 122756210763577),
     ],
@@ -255,5 +300,11 @@ def test(solver: Callable[[str], int], file: str, ans: int) -> None:
     assert solver(read_file(filepath)) == ans
 
 
+@pytest.mark.parametrize("file", ["sample.txt", "input.txt"])
+def test_index_consistency(file: str) -> None:
+    filepath = os.path.join(os.path.dirname(__file__), file)
+    check_consistency(read_file(filepath), 20000)
+
+
 if __name__ == "__main__":
     SystemExit(main())
@@ -2,55 +2,23 @@ from __future__ import annotations
 
 import argparse
 import os
-from collections.abc import Callable, Sequence
+from collections.abc import Callable
 
 import pytest
 
-from aoclib.grid2d import Di4, Pos, parse_grid
+from aoclib.grid2d import Grid, grid_bfs, parity_counts
 from aoclib.util import read_file
 
 
-def find_start(g: Sequence[Sequence[str]]) -> Pos:
-    n = len(g)
-    m = len(g[0])
-    for i in range(n):
-        for j in range(m):
-            if g[i][j] == "S":
-                return Pos(i, j)
-    assert False
-
-
-def solve_1(g: Sequence[Sequence[str]], steps=64) -> int:
-    n = len(g)
-    m = len(g[0])
-    dp = [[[0 for k in range(steps + 1)] for j in range(m)] for i in range(n)]
-
-    s = find_start(g)
-    dp[s.r][s.c][0] = 1
-
-    for k in range(1, steps + 1):
-        for r in range(n):
-            for c in range(m):
-                u = Pos(r, c)
-                if dp[u.r][u.c][k - 1] == 0:
-                    continue
-                for d in Di4:
-                    v = u.go(d)
-                    if not v.inside(g) or g[v.r][v.c] == "#":
-                        continue
-                    dp[v.r][v.c][k] |= dp[u.r][u.c][k - 1]
-
-    ans = 0
-
-    for r in range(n):
-        for c in range(m):
-            ans += dp[r][c][steps]
-
-    return ans
+def solve_1(g: Grid, steps=64) -> int:
+    s = g.find("S")
+    assert s is not None
+    dist = grid_bfs(g, [s], passable=".", max_depth=steps)
+    return parity_counts(dist)[steps % 2]
 
 
 def part1(input: str) -> int:
-    g = parse_grid(input)
+    g = Grid.parse(input)
     return solve_1(g)
 
 
@@ -76,12 +44,12 @@ def main():
         print(f"Part 2: {part2(input)}")
 
 
-@pytest.mark.skip  # remove me
 @pytest.mark.parametrize(
     ("solver", "file", "ans"),
     [
-        (part1, "sample.txt", -1),
-        (part2, "sample.txt", -1),
+        (lambda input: solve_1(Grid.parse(input), steps=6), "sample.txt", 16),
+        (part1, "input.txt", 3562),
+        # (part2, "sample.txt", -1),
     ],
 )
 def test(solver: Callable[[str], int], file: str, ans: int) -> None:
@@ -2,78 +2,85 @@ from __future__ import annotations
 
 import argparse
 import os
+import timeit
 from collections.abc import Callable
 from fractions import Fraction
 from functools import partial
+from typing import Any
 
 import pytest
-import z3
 
 from aoclib.geometry.line import Line
 from aoclib.geometry.point import Point
+from aoclib.geometry.point3 import Point3, PointArray
+from aoclib.geometry.rational import Rational
+from aoclib.geometry.ray import count_crossings_in_box, rays_cross_in_box
+from aoclib.linalg import solve
 from aoclib.util import read_file
 
-Coor3D = tuple[int, int, int]
 
-
-def parse_triple(s: str) -> Coor3D:
+def parse_triple(s: str) -> Point3:
     ints = list(map(int, s.split(",")))
-    return ints[0], ints[1], ints[2]
+    return Point3(ints[0], ints[1], ints[2])
 
 
-def parse_line(line: str) -> tuple[Coor3D, Coor3D]:
+def parse_line(line: str) -> tuple[Point3, Point3]:
     parts = line.split("@")
     return parse_triple(parts[0]), parse_triple(parts[1])
 
 
+def parse_hailstones(input: str) -> tuple[PointArray, PointArray]:
+    """The hailstone positions and velocities."""
+    us = PointArray()
+    vs = PointArray()
+    for line in input.splitlines():
+        ui, vi = parse_line(line)
+        us.append(ui)
+        vs.append(vi)
+    return us, vs
+
+
+def parse_rays(input: str) -> tuple[list[Point[int]], list[Point[int]]]:
+    """The xy projections of the hailstone positions and velocities."""
+    us, vs = parse_hailstones(input)
+    return list(map(Point, us.xs, us.ys)), list(map(Point, vs.xs, vs.ys))
+
+
 def part1(
     input: str,
     minc: int = 2 * 10**14,
     maxc: int = 4 * 10**14,
 ) -> int:
-    min_x = min_y = minc
-    max_x = max_y = maxc
+    us, vs = parse_rays(input)
 
-    us = []
-    vs = []
-    for line in input.splitlines():
-        ui, vi = parse_line(line)
-        us.append(Point(ui[0], ui[1]))
-        vs.append(Point(vi[0], vi[1]))
-
-    lines: list[Line[int]] = []
+    ans = 0
 
     for i in range(len(us)):
-        lines.append(Line.from_direction_and_point(v=vs[i], p=us[i]))
+        for j in range(i + 1, len(us)):
+            if rays_cross_in_box(us[i], vs[i], us[j], vs[j], minc, maxc):
+                ans += 1
 
-    ans = 0
+    return ans
 
-    for i in range(len(lines)):
-        for j in range(i + 1, len(lines)):
-            li = lines[i]
-            lj = lines[j]
-            t = li.intersect(lj)
-            if t is None:
-                # print(f"{li} does not intersect with {lj}")
-                pass
-            else:
-                # print(f"{li} intersects with {lj} at {t}")
-                if min_x <= t.x <= max_x and min_y <= t.y <= max_y:
-                    uit = t - us[i]
-                    ujt = t - us[j]
-                    # given two parallel vectors (i.e. cross product should be ~0)
-                    # dot product > 0 means
-                    # the two parallel vectors have the same direction
-                    if uit.dot(vs[i]) > 0 and ujt.dot(vs[j]) > 0:
-                        ans += 1
 
-    return ans
+def part1_sweep(
+    input: str,
+    minc: int = 2 * 10**14,
+    maxc: int = 4 * 10**14,
+) -> int:
+    """
+    Counts by sweeping the clipped paths. With a few hundred hailstones that
+    mostly cross, the pairwise loop is faster; this is for large inputs.
+    """
+    us, vs = parse_rays(input)
+    return count_crossings_in_box(us, vs, minc, maxc)
 
 
 def part1_rational(
     input: str,
     minc: int = 2 * 10**14,
     maxc: int = 4 * 10**14,
+    number: Callable[[int], Any] = Fraction,
 ) -> int:
     min_x = min_y = minc
     max_x = max_y = maxc
@@ -82,8 +89,8 @@ def part1_rational(
     vs = []
     for line in input.splitlines():
         ui, vi = parse_line(line)
-        us.append(Point(x=Fraction(ui[0]), y=Fraction(ui[1])))
-        vs.append(Point(x=Fraction(vi[0]), y=Fraction(vi[1])))
+        us.append(Point(x=number(ui.x), y=number(ui.y)))
+        vs.append(Point(x=number(vi.x), y=number(vi.y)))
 
     lines: list[Line] = []
 
@@ -116,8 +123,70 @@ def part1_rational(
     return ans
 
 
+def benchmark_rational(input: str, repeat: int = 3) -> dict[str, float]:
+    """Best wall time of part1_rational over Fraction and over Rational."""
+    times = {}
+    for name, number in (("Fraction", Fraction), ("Rational", Rational)):
+        times[name] = min(
+            timeit.repeat(
+                partial(part1_rational, input, number=number),
+                number=1,
+                repeat=repeat,
+            )
+        )
+    return times
+
+
+def pair_equations(
+    us: PointArray, vs: PointArray, cs: PointArray, i: int, j: int
+) -> tuple[list[list[int]], list[int]]:
+    """
+    Three linear equations on the rock ``(x_p, y_p, z_p, vx_p, vy_p, vz_p)``.
+
+    The rock hits hailstone i iff ``(u' - ui) x (v' - vi) = 0``. Expanding,
+    the quadratic term ``u' x v'`` is the same for every hailstone, so the
+    difference of the equations of i and j is linear:
+    ``u' x (vj - vi) + (uj - ui) x v' = uj x vj - ui x vi``, where
+    ``cs[i] = ui x vi``.
+    """
+    a = vs[j] - vs[i]
+    d = us[j] - us[i]
+    rows = [
+        [0, a.z, -a.y, 0, -d.z, d.y],
+        [-a.z, 0, a.x, d.z, 0, -d.x],
+        [a.y, -a.x, 0, -d.y, d.x, 0],
+    ]
+    c = cs[j] - cs[i]
+    return rows, [c.x, c.y, c.z]
+
+
 def part2(input: str) -> int:
-    z3.set_option(verbose=10)
+    us, vs = parse_hailstones(input)
+
+    # Moving hailstone 0 to the origin keeps the cross products small
+    origin = us[0]
+    us = us.translate(-origin)
+    cs = us.cross(vs)
+
+    # Hailstone 0 paired with two others gives a 6x6 system; try further
+    # pairs in the rare case that one is degenerate.
+    for j in range(1, len(us)):
+        for k in range(j + 1, len(us)):
+            a1, b1 = pair_equations(us, vs, cs, 0, j)
+            a2, b2 = pair_equations(us, vs, cs, 0, k)
+            x = solve(a1 + a2, b1 + b2)
+            if x is not None:
+                assert all(c.denominator == 1 for c in x)
+                rock = Point3(*map(int, x[:3])) + origin
+                return rock.x + rock.y + rock.z
+
+    assert False, "no unique rock"
+
+
+def part2_z3(input: str) -> int:
+    """Cross-check that hands the nonlinear system to z3."""
+    import z3  # type: ignore[import-untyped]
+
     us = []
     vs = []
     for line in input.splitlines():
@@ -143,12 +212,12 @@ def part2(input: str) -> int:
     t = [z3.Real(f"t_{i}") for i in range(n)]
 
     for i in range(n):
-        x_i = us[i][0]
-        vx_i = vs[i][0]
-        y_i = us[i][1]
-        vy_i = vs[i][1]
-        z_i = us[i][2]
-        vz_i = vs[i][2]
+        x_i = us[i].x
+        vx_i = vs[i].x
+        y_i = us[i].y
+        vy_i = vs[i].y
+        z_i = us[i].z
+        vz_i = vs[i].z
 
         solver.add(x_p - x_i + (vx_p - vx_i) * t[i] == 0)
         solver.add(y_p - y_i + (vy_p - vy_i) * t[i] == 0)
@@ -163,7 +232,7 @@ def part2(input: str) -> int:
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("part", choices=["1", "2"])
+    parser.add_argument("part", choices=["1", "2", "z", "b"])
     parser.add_argument("input_file")
 
     args = parser.parse_args()
@@ -171,6 +240,11 @@ def main():
 
     if args.part == "1":
         print(f"Part 1: {part1_rational(input)}")
+    elif args.part == "b":
+        for name, t in benchmark_rational(input).items():
+            print(f"part1_rational over {name}: {t:.3f}s")
+    elif args.part == "z":
+        print(f"Part 2 (z3): {part2_z3(input)}")
     else:
         print(f"Part 2: {part2(input)}")
 
@@ -179,9 +253,12 @@ def main():
     ("solver", "file", "ans"),
     [
         (partial(part1, minc=7, maxc=27), "sample.txt", 2),
+        (partial(part1_sweep, minc=7, maxc=27), "sample.txt", 2),
         (partial(part1_rational, minc=7, maxc=27), "sample.txt", 2),
         (part1, "input.txt", 16779),
+        (part1_sweep, "input.txt", 16779),
         (part1_rational, "input.txt", 16779),
+        (partial(part1_rational, number=Rational), "input.txt", 16779),
         (part2, "sample.txt", 47),
         (part2, "input.txt", 871983857253169),
     ],
@@ -195,5 +272,18 @@ def test(
     assert solver(read_file(filepath)) == ans
 
 
+@pytest.mark.parametrize(
+    ("file", "ans"),
+    [
+        ("sample.txt", 47),
+        ("input.txt", 871983857253169),
+    ],
+)
+def test_part2_z3(file: str, ans: int) -> None:
+    pytest.importorskip("z3")
+    filepath = os.path.join(os.path.dirname(__file__), file)
+    assert part2_z3(read_file(filepath)) == ans
+
+
 if __name__ == "__main__":
     SystemExit(main())
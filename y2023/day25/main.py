@@ -4,12 +4,13 @@ import argparse
 import itertools
 import math
 import os
-from collections import Counter
 from collections.abc import Callable, Sequence
 
 import pytest
 
 from aoclib.flow.dinic import Dinic
+from aoclib.flow.gomory_hu import GomoryHu
+from aoclib.flow.stoer_wagner import stoer_wagner
 from aoclib.graph.bridge import find_bridges
 from aoclib.graph.graph import UndiGraph
 from aoclib.structures.dsu import DSU
@@ -23,8 +24,19 @@ def parse_line(line: str) -> tuple[str, Sequence[str]]:
     return u, vs
 
 
+def parse_edges(input: str) -> tuple[int, list[tuple[int, int, int]]]:
+    nodes: dict[str, int] = {}
+    edges = []
+    for line in input.splitlines():
+        su, svs = parse_line(line)
+        u = nodes.setdefault(su, len(nodes))
+        for sv in svs:
+            v = nodes.setdefault(sv, len(nodes))
+            edges.append((u, v, 1))
+    return len(nodes), edges
+
+
 def part1(input: str) -> int:
-    # Running this with pypy3 took about 30 mins
     nodes: dict[str, int] = {}
     node_label: list[str] = []
     n = 0
@@ -55,22 +67,17 @@ def part1(input: str) -> int:
     for u, v in edges:
         g.add_edge(u, v)
 
-    for s in range(n):
-        for t in range(n):
-            if s == t:
-                continue
+    # Any node is on one side of the 3-edge cut, so fixing s and probing every t
+    # finds it. Max flows of 4 or more are cut short since they are useless.
+    dinic = Dinic.from_graph(g.freeze(), s=0, t=1, integral=True)
 
-            dinic = Dinic(n=n, s=s, t=t)
-
-            for u in range(g.n):
-                for v in g.adj[u]:
-                    dinic.add_edge(u, v, 1)
-
-            max_flow = dinic.max_flow()
-            if max_flow == 3:
-                k = len(dinic.get_min_cut())
-                ans = k * (n - k)
-                return ans
+    for t in range(1, n):
+        dinic.set_terminals(0, t)
+        max_flow = dinic.max_flow(limit=4)
+        if max_flow == 3:
+            k = len(dinic.get_min_cut())
+            ans = k * (n - k)
+            return ans
 
     assert False
 
@@ -136,19 +143,33 @@ def part1_slow(input: str) -> int:
     print(disabled_triple)
 
     dsu = DSU(n)
-    components: Counter = Counter()
     for u in range(g.n):
         for v in g.adj[u]:
             if u < v and (u, v) not in disabled_triple:
                 dsu.merge(u, v)
-    for u in range(g.n):
-        components[dsu.find(u)] += 1
+    assert dsu.num_components == 2
 
-    ans = math.prod(components.values())
+    ans = math.prod(dsu.components())
 
     return ans
 
 
+def part1_stoer_wagner(input: str) -> int:
+    n, edges = parse_edges(input)
+    cut, side = stoer_wagner(n, edges)
+    assert cut == 3
+    return len(side) * (n - len(side))
+
+
+def part1_gomory_hu(input: str) -> int:
+    n, edges = parse_edges(input)
+    gh = GomoryHu(n, edges, integral=True)
+    u = min(range(1, n), key=lambda u: gh.weight[u])
+    assert gh.weight[u] == 3
+    k = len(gh.side[u])
+    return k * (n - k)
+
+
 def part2(input: str) -> int:
     return 0
 
@@ -172,6 +193,9 @@ def main():
     [
         (part1, "sample.txt", 54),
         (part1, "input.txt", 551196),
+        (part1_stoer_wagner, "sample.txt", 54),
+        (part1_stoer_wagner, "input.txt", 551196),
+        (part1_gomory_hu, "sample.txt", 54),
         # (part2, "sample.txt", -1),
     ],
 )